@@ -1,11 +1,16 @@
 # apps/accounts/admin.py - COMPLETE FILE
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.db.models.functions import Now
+from django.utils import timezone
 from .models import User, UserProfile, BeltProgress, TrainingStats, OTPVerification
 
 
-class UserProfileInline(admin.StackedInline):
+class UserProfileInline(admin.TabularInline):
     model = UserProfile
+    fields = ('belt_level', 'phone', 'city', 'years_of_experience')
+    classes = ('collapse',)
     can_delete = False
     verbose_name_plural = 'Profile'
 
@@ -16,6 +21,8 @@ class UserAdmin(BaseUserAdmin):
     list_filter = ('is_instructor', 'is_member', 'email_verified', 'is_staff', 'is_active')
     search_fields = ('email', 'first_name', 'last_name')
     ordering = ('-date_joined',)
+    list_per_page = 50
+    show_full_result_count = False
     
     fieldsets = (
         (None, {'fields': ('email', 'password')}),
@@ -38,6 +45,10 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_filter = ('belt_level', 'gender', 'country')
     search_fields = ('user__email', 'user__first_name', 'user__last_name', 'phone')
     readonly_fields = ('joined_at', 'updated_at', 'age')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+    list_per_page = 50
+    show_full_result_count = False
     
     fieldsets = (
         ('User', {'fields': ('user',)}),
@@ -48,6 +59,15 @@ class UserProfileAdmin(admin.ModelAdmin):
         ('Notifications', {'fields': ('email_notifications', 'sms_notifications')}),
         ('Timestamps', {'fields': ('joined_at', 'updated_at')}),
     )
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_completeness()
+    
+    def is_profile_complete(self, obj):
+        return obj.profile_complete
+    is_profile_complete.boolean = True
+    is_profile_complete.short_description = 'Profile complete'
+    is_profile_complete.admin_order_field = 'profile_complete'
 
 
 @admin.register(BeltProgress)
@@ -57,6 +77,10 @@ class BeltProgressAdmin(admin.ModelAdmin):
     search_fields = ('user__email', 'user__first_name', 'user__last_name')
     date_hierarchy = 'achieved_on'
     readonly_fields = ('created_at',)
+    list_select_related = ('user', 'instructor')
+    raw_id_fields = ('user', 'instructor')
+    list_per_page = 50
+    show_full_result_count = False
 
 
 @admin.register(TrainingStats)
@@ -64,38 +88,59 @@ class TrainingStatsAdmin(admin.ModelAdmin):
     list_display = ('user', 'total_classes_attended', 'total_training_hours', 'current_streak_days', 'tournaments_participated')
     search_fields = ('user__email', 'user__first_name', 'user__last_name')
     readonly_fields = ('updated_at',)
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+    list_per_page = 50
+    show_full_result_count = False
 
 
 @admin.register(OTPVerification)
 class OTPVerificationAdmin(admin.ModelAdmin):
-    list_display = ('email', 'purpose', 'otp_code', 'is_verified', 'attempts', 'created_at', 'expires_at', 'is_expired_status')
-    list_filter = ('purpose', 'is_verified', 'created_at')
-    search_fields = ('email', 'user__email', 'otp_code')
+    list_display = ('email', 'purpose', 'is_verified', 'attempts', 'created_at', 'expires_at', 'is_expired_status')
+    list_filter = ('purpose', 'is_verified', 'is_active', 'created_at')
+    search_fields = ('email',)
     readonly_fields = ('created_at', 'verified_at', 'is_expired_status')
     date_hierarchy = 'created_at'
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+    list_per_page = 50
+    show_full_result_count = False
     
     fieldsets = (
         ('User Information', {'fields': ('user', 'email', 'phone')}),
-        ('OTP Details', {'fields': ('otp_code', 'purpose')}),
-        ('Verification Status', {'fields': ('is_verified', 'verified_at', 'attempts', 'max_attempts')}),
+        ('OTP Details', {'fields': ('purpose',)}),
+        ('Verification Status', {'fields': ('is_verified', 'is_active', 'verified_at', 'attempts', 'max_attempts')}),
         ('Timestamps', {'fields': ('created_at', 'expires_at', 'is_expired_status')}),
     )
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            _is_expired=ExpressionWrapper(Q(expires_at__lt=Now()), output_field=BooleanField())
+        )
+    
     def is_expired_status(self, obj):
         """Display whether OTP is expired"""
-        return obj.is_expired()
+        # Annotated in get_queryset; unsaved objects on the add form fall back to Python
+        expired = getattr(obj, '_is_expired', None)
+        if expired is None and obj.expires_at:
+            expired = obj.is_expired()
+        return expired
     is_expired_status.boolean = True
+    is_expired_status.admin_order_field = '_is_expired'
     is_expired_status.short_description = 'Expired'
     
     actions = ['cleanup_expired_otps']
     
     def cleanup_expired_otps(self, request, queryset):
-        """Admin action to clean up expired OTPs"""
-        deleted_count = OTPVerification.cleanup_expired()
+        """Admin action to delete the selected OTPs that have expired"""
+        deleted_count, _ = queryset.filter(expires_at__lt=timezone.now()).delete()
         self.message_user(request, f'{deleted_count} expired OTP records deleted.')
-    cleanup_expired_otps.short_description = 'Delete expired OTP records'
+    cleanup_expired_otps.short_description = 'Delete selected expired OTP records'
 
 
 # Register User model
-admin.site.unregister(User) if admin.site.is_registered(User) else None
-admin.site.register(User, UserAdmin)
\ No newline at end of file
+try:
+    admin.site.unregister(User)
+except admin.sites.NotRegistered:
+    pass
+admin.site.register(User, UserAdmin)
@@ -1,8 +1,19 @@
+import atexit
+import logging
+import sys
+
 from django.apps import AppConfig
 
 
 class AccountsConfig(AppConfig):
     name = 'apps.accounts'
 
-def ready(self):
-    import apps.accounts.signals
+    def ready(self):
+        import apps.accounts.signals  # noqa
+
+        # dictConfig builds the 'queue' handler's listener but never starts it
+        if sys.version_info >= (3, 12):
+            handler = logging.getHandlerByName('queue')
+            if handler is not None and handler.listener is not None:
+                handler.listener.start()
+                atexit.register(handler.listener.stop)
@@ -1,8 +1,13 @@
 # apps/accounts/forms.py - COMPLETE FILE
+import re
+from functools import lru_cache
+from types import MappingProxyType
+
 from django import forms
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.contrib.auth import get_user_model
 from .models import User, UserProfile, BeltProgress
+from .utils import OTP_CODE_RE
 
 # Get the custom user model
 User = get_user_model()
@@ -38,6 +43,46 @@ FILE_INPUT_CLASSES = (
     "hover:file:bg-[#FBBF24] transition-colors"
 )
 
+# Read-only widget attrs shared by the forms below. Widgets copy their attrs
+# on construction, so these are never mutated; use dict(BASE, key=...) to
+# extend one for a single field.
+_INPUT_ATTRS = MappingProxyType({"class": INPUT_CLASSES})
+_SELECT_ATTRS = MappingProxyType({"class": SELECT_CLASSES})
+_TEXTAREA_ATTRS = MappingProxyType({"class": TEXTAREA_CLASSES})
+_CHECKBOX_ATTRS = MappingProxyType({"class": CHECKBOX_CLASSES})
+
+_EMAIL_ATTRS = MappingProxyType({
+    "placeholder": "you@example.com",
+    "class": INPUT_CLASSES,
+    "autocomplete": "email",
+})
+_CURRENT_PASSWORD_ATTRS = MappingProxyType({
+    "class": INPUT_CLASSES,
+    "autocomplete": "current-password",
+})
+_NEW_PASSWORD_ATTRS = MappingProxyType({
+    "class": INPUT_CLASSES,
+    "autocomplete": "new-password",
+})
+
+# Password policy checks (a letter and a digit), compiled once per process
+_PW_LETTER = re.compile(r"[^\W\d_]").search
+_PW_DIGIT = re.compile(r"\d").search
+
+
+# Fields deep-copy these, and each form instance copies its fields again, so the
+# widgets (and their error classes) are never shared between requests
+_FIRST_NAME_WIDGET = forms.TextInput(attrs=dict(_INPUT_ATTRS, placeholder="Enter your first name"))
+_LAST_NAME_WIDGET = forms.TextInput(attrs=dict(_INPUT_ATTRS, placeholder="Enter your last name"))
+
+
+def _clean_name(name):
+    """Strip and title-case a personal name; empty input becomes ''."""
+    if not name:
+        return ""
+    stripped = name.strip()
+    return stripped.title() if stripped else ""
+
 
 # =============================================================================
 # OTP VERIFICATION FORMS
@@ -69,18 +114,13 @@ class OTPVerificationForm(forms.Form):
         """
         Validate OTP code format
         """
-        code = self.cleaned_data.get('otp_code')
+        # Remove spaces and validate
+        code = (self.cleaned_data.get('otp_code') or '').replace(' ', '')
         
         if not code:
             raise forms.ValidationError("Please enter the verification code.")
         
-        # Remove spaces and validate
-        code = code.replace(' ', '')
-        
-        if not code.isdigit():
-            raise forms.ValidationError("Verification code must contain only numbers.")
-        
-        if len(code) != 6:
+        if not OTP_CODE_RE.match(code):
             raise forms.ValidationError("Verification code must be exactly 6 digits.")
         
         return code
@@ -105,58 +145,42 @@ class UserRegisterForm(UserCreationForm):
     first_name = forms.CharField(
         label="First Name",
         max_length=50,
-        widget=forms.TextInput(attrs={
-            "placeholder": "Enter your first name",
-            "class": INPUT_CLASSES,
-        }),
+        widget=_FIRST_NAME_WIDGET,
         help_text="Required. Enter your first name."
     )
 
     last_name = forms.CharField(
         label="Last Name",
         max_length=50,
-        widget=forms.TextInput(attrs={
-            "placeholder": "Enter your last name",
-            "class": INPUT_CLASSES,
-        }),
+        widget=_LAST_NAME_WIDGET,
         help_text="Required. Enter your last name."
     )
 
     email = forms.EmailField(
         label="Email Address",
-        widget=forms.EmailInput(attrs={
-            "placeholder": "you@example.com",
-            "class": INPUT_CLASSES,
-        }),
+        widget=forms.EmailInput(attrs=_EMAIL_ATTRS),
         help_text="Required. We'll send a verification code to this email."
     )
 
     password1 = forms.CharField(
         label="Password",
         strip=False,
-        widget=forms.PasswordInput(attrs={
-            "placeholder": "Create a strong password",
-            "class": INPUT_CLASSES,
-        }),
+        widget=forms.PasswordInput(attrs=dict(_NEW_PASSWORD_ATTRS, placeholder="Create a strong password")),
         help_text="Must be at least 8 characters with letters and numbers."
     )
 
     password2 = forms.CharField(
         label="Confirm Password",
         strip=False,
-        widget=forms.PasswordInput(attrs={
-            "placeholder": "Re-enter your password",
-            "class": INPUT_CLASSES,
-        }),
+        widget=forms.PasswordInput(attrs=dict(_NEW_PASSWORD_ATTRS, placeholder="Re-enter your password")),
         help_text="Enter the same password as before, for verification."
     )
     
+    # Enforced in clean_agree_terms; the HTML required attr keeps browser validation
     agree_terms = forms.BooleanField(
-        required=True,
+        required=False,
         label="I agree to the Terms of Service and Privacy Policy",
-        widget=forms.CheckboxInput(attrs={
-            "class": CHECKBOX_CLASSES,
-        })
+        widget=forms.CheckboxInput(attrs=dict(_CHECKBOX_ATTRS, required=True))
     )
 
     class Meta:
@@ -170,25 +194,31 @@ class UserRegisterForm(UserCreationForm):
         email = self.cleaned_data.get("email")
         if email:
             email = email.lower()
-            if User.objects.filter(email=email).exists():
+            if User.objects.filter(email__iexact=email).exists():
                 raise forms.ValidationError(
                     "This email address is already registered. Please use a different email or try logging in."
                 )
         return email
 
+    def clean_agree_terms(self):
+        """
+        Require the terms checkbox to be ticked.
+        """
+        if not self.cleaned_data.get("agree_terms"):
+            raise forms.ValidationError("You must agree to the Terms of Service.")
+        return True
+
     def clean_first_name(self):
         """
         Clean and capitalize first name.
         """
-        first_name = self.cleaned_data.get("first_name")
-        return first_name.strip().title() if first_name else ""
+        return _clean_name(self.cleaned_data.get("first_name"))
 
     def clean_last_name(self):
         """
         Clean and capitalize last name.
         """
-        last_name = self.cleaned_data.get("last_name")
-        return last_name.strip().title() if last_name else ""
+        return _clean_name(self.cleaned_data.get("last_name"))
 
 
 # =============================================================================
@@ -201,21 +231,13 @@ class UserLoginForm(AuthenticationForm):
     """
     username = forms.EmailField(
         label="Email Address",
-        widget=forms.EmailInput(attrs={
-            'class': INPUT_CLASSES,
-            'placeholder': 'you@example.com',
-            'autocomplete': 'email',
-        })
+        widget=forms.EmailInput(attrs=_EMAIL_ATTRS)
     )
 
     password = forms.CharField(
         label="Password",
         strip=False,
-        widget=forms.PasswordInput(attrs={
-            'class': INPUT_CLASSES,
-            'placeholder': 'Enter your password',
-            'autocomplete': 'current-password',
-        })
+        widget=forms.PasswordInput(attrs=dict(_CURRENT_PASSWORD_ATTRS, placeholder="Enter your password"))
     )
     
     require_otp = forms.BooleanField(
@@ -268,68 +290,25 @@ class UserProfileForm(forms.ModelForm):
         ]
         
         widgets = {
-            "phone": forms.TextInput(attrs={
-                "placeholder": "+254XXXXXXXXX",
-                "class": INPUT_CLASSES,
-            }),
-            "emergency_contact_name": forms.TextInput(attrs={
-                "placeholder": "Emergency contact name",
-                "class": INPUT_CLASSES,
-            }),
-            "emergency_contact_phone": forms.TextInput(attrs={
-                "placeholder": "+254XXXXXXXXX",
-                "class": INPUT_CLASSES,
-            }),
-            "belt_level": forms.Select(attrs={
-                "class": SELECT_CLASSES,
-            }),
-            "date_of_birth": forms.DateInput(attrs={
-                "type": "date",
-                "class": INPUT_CLASSES,
-            }),
-            "gender": forms.Select(attrs={
-                "class": SELECT_CLASSES,
-            }),
-            "address": forms.TextInput(attrs={
-                "placeholder": "Street address",
-                "class": INPUT_CLASSES,
-            }),
-            "city": forms.TextInput(attrs={
-                "placeholder": "City",
-                "class": INPUT_CLASSES,
-            }),
-            "country": forms.TextInput(attrs={
-                "placeholder": "Country",
-                "class": INPUT_CLASSES,
-            }),
-            "bio": forms.Textarea(attrs={
-                "rows": 4,
-                "placeholder": "Tell us about yourself...",
-                "class": TEXTAREA_CLASSES,
-            }),
-            "preferred_training_time": forms.TextInput(attrs={
-                "placeholder": "e.g., Mornings, Evenings",
-                "class": INPUT_CLASSES,
-            }),
-            "training_goals": forms.Textarea(attrs={
-                "rows": 3,
-                "placeholder": "What are your training goals?",
-                "class": TEXTAREA_CLASSES,
-            }),
-            "years_of_experience": forms.NumberInput(attrs={
-                "class": INPUT_CLASSES,
-                "min": 0,
-            }),
+            "phone": forms.TextInput(attrs=dict(_INPUT_ATTRS, placeholder="+254XXXXXXXXX")),
+            "emergency_contact_name": forms.TextInput(attrs=dict(_INPUT_ATTRS, placeholder="Emergency contact name")),
+            "emergency_contact_phone": forms.TextInput(attrs=dict(_INPUT_ATTRS, placeholder="+254XXXXXXXXX")),
+            "belt_level": forms.Select(attrs=_SELECT_ATTRS),
+            "date_of_birth": forms.DateInput(attrs=dict(_INPUT_ATTRS, type="date")),
+            "gender": forms.Select(attrs=_SELECT_ATTRS),
+            "address": forms.TextInput(attrs=dict(_INPUT_ATTRS, placeholder="Street address")),
+            "city": forms.TextInput(attrs=dict(_INPUT_ATTRS, placeholder="City")),
+            "country": forms.TextInput(attrs=dict(_INPUT_ATTRS, placeholder="Country")),
+            "bio": forms.Textarea(attrs=dict(_TEXTAREA_ATTRS, rows=4, placeholder="Tell us about yourself...")),
+            "preferred_training_time": forms.TextInput(attrs=dict(_INPUT_ATTRS, placeholder="e.g., Mornings, Evenings")),
+            "training_goals": forms.Textarea(attrs=dict(_TEXTAREA_ATTRS, rows=3, placeholder="What are your training goals?")),
+            "years_of_experience": forms.NumberInput(attrs=dict(_INPUT_ATTRS, min=0)),
             "profile_picture": forms.FileInput(attrs={
                 "class": FILE_INPUT_CLASSES,
                 "accept": "image/*",
             }),
-            "email_notifications": forms.CheckboxInput(attrs={
-                "class": CHECKBOX_CLASSES,
-            }),
-            "sms_notifications": forms.CheckboxInput(attrs={
-                "class": CHECKBOX_CLASSES,
-            }),
+            "email_notifications": forms.CheckboxInput(attrs=_CHECKBOX_ATTRS),
+            "sms_notifications": forms.CheckboxInput(attrs=_CHECKBOX_ATTRS),
         }
 
         labels = {
@@ -375,14 +354,8 @@ class UserAccountForm(forms.ModelForm):
         fields = ["first_name", "last_name", "email"]
         
         widgets = {
-            "first_name": forms.TextInput(attrs={
-                "placeholder": "First name",
-                "class": INPUT_CLASSES,
-            }),
-            "last_name": forms.TextInput(attrs={
-                "placeholder": "Last name",
-                "class": INPUT_CLASSES,
-            }),
+            "first_name": _FIRST_NAME_WIDGET,
+            "last_name": _LAST_NAME_WIDGET,
             "email": forms.EmailInput(attrs={
                 "placeholder": "Email address",
                 "class": INPUT_CLASSES,
@@ -396,8 +369,11 @@ class UserAccountForm(forms.ModelForm):
         email = self.cleaned_data.get("email")
         if email:
             email = email.lower()
+            # Unchanged email needs no uniqueness query
+            if self.instance.pk and email == (self.instance.email or "").lower():
+                return email
             # Exclude current user from uniqueness check
-            if User.objects.filter(email=email).exclude(pk=self.instance.pk).exists():
+            if User.objects.filter(email__iexact=email).exclude(pk=self.instance.pk).exists():
                 raise forms.ValidationError("This email is already in use.")
         return email
 
@@ -483,32 +459,20 @@ class PasswordChangeForm(forms.Form):
     old_password = forms.CharField(
         label="Current Password",
         strip=False,
-        widget=forms.PasswordInput(attrs={
-            "placeholder": "Enter your current password",
-            "class": INPUT_CLASSES,
-            "autocomplete": "current-password",
-        })
+        widget=forms.PasswordInput(attrs=dict(_CURRENT_PASSWORD_ATTRS, placeholder="Enter your current password"))
     )
     
     new_password1 = forms.CharField(
         label="New Password",
         strip=False,
-        widget=forms.PasswordInput(attrs={
-            "placeholder": "Enter new password",
-            "class": INPUT_CLASSES,
-            "autocomplete": "new-password",
-        }),
+        widget=forms.PasswordInput(attrs=dict(_NEW_PASSWORD_ATTRS, placeholder="Enter new password")),
         help_text="Must be at least 8 characters with letters and numbers."
     )
     
     new_password2 = forms.CharField(
         label="Confirm New Password",
         strip=False,
-        widget=forms.PasswordInput(attrs={
-            "placeholder": "Confirm new password",
-            "class": INPUT_CLASSES,
-            "autocomplete": "new-password",
-        })
+        widget=forms.PasswordInput(attrs=dict(_NEW_PASSWORD_ATTRS, placeholder="Confirm new password"))
     )
 
     def clean(self):
@@ -541,10 +505,7 @@ class PasswordChangeForm(forms.Form):
                 )
             
             # Check for at least one letter and one number
-            has_letter = any(c.isalpha() for c in password)
-            has_number = any(c.isdigit() for c in password)
-            
-            if not (has_letter and has_number):
+            if not (_PW_LETTER(password) and _PW_DIGIT(password)):
                 raise forms.ValidationError(
                     "Password must contain both letters and numbers."
                 )
@@ -556,6 +517,12 @@ class PasswordChangeForm(forms.Form):
 # SEARCH/FILTER FORMS (Optional)
 # =============================================================================
 
+@lru_cache(maxsize=None)
+def _belt_level_choices():
+    """Belt filter choices, built on first use and then reused."""
+    return (('', 'All Belts'), *UserProfile.BELT_LEVELS)
+
+
 class UserSearchForm(forms.Form):
     """
     User search form for admin/instructor use.
@@ -570,7 +537,7 @@ class UserSearchForm(forms.Form):
     
     belt_level = forms.ChoiceField(
         required=False,
-        choices=[('', 'All Belts')] + UserProfile.BELT_LEVELS,
+        choices=_belt_level_choices,
         widget=forms.Select(attrs={
             "class": SELECT_CLASSES,
         })
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-15 06:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_user_email_upper_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='otpverification',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 6.0 on 2026-10-15 06:34
+
+from django.db import migrations, models
+
+
+TRIGRAM_INDEXES = (
+    ('accounts_otp_email_trgm_idx', 'accounts_otpverification'),
+    ('accounts_user_email_trgm_idx', 'accounts_user'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # Admin search issues ILIKE '%q%'; only PostgreSQL can index that.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin (email gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_alter_otpverification_expires_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='otpverification',
+            index=models.Index(fields=['otp_code'], name='accounts_ot_otp_cod_a8a0b0_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
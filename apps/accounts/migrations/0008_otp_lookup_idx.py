@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-15 06:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_otp_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='otpverification',
+            index=models.Index(fields=['email', 'purpose', 'is_verified', '-created_at'], name='otp_lookup_idx'),
+        ),
+    ]
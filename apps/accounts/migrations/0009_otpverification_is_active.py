@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-15 06:37
+
+from django.db import migrations, models
+
+
+def unmark_invalidated_otps(apps, schema_editor):
+    # Superseded OTPs used to be flagged is_verified=True without a verified_at
+    OTPVerification = apps.get_model('accounts', 'OTPVerification')
+    OTPVerification.objects.filter(is_verified=True, verified_at__isnull=True).update(
+        is_verified=False, is_active=False
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_otp_lookup_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='otpverification',
+            name='otp_lookup_idx',
+        ),
+        migrations.AddField(
+            model_name='otpverification',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddIndex(
+            model_name='otpverification',
+            index=models.Index(fields=['email', 'purpose', 'is_active', '-created_at'], name='otp_lookup_idx'),
+        ),
+        migrations.RunPython(unmark_invalidated_otps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 6.0 on 2026-10-15 07:10
+
+import hashlib
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def hash_existing_codes(apps, schema_editor):
+    # Frozen copy of accounts.utils.hash_otp_code as it was when this migration
+    # was written, so later changes to the live helper can't alter it
+    key = hashlib.blake2s(getattr(settings, 'OTP_KEY', settings.SECRET_KEY).encode()).digest()
+    OTPVerification = apps.get_model('accounts', 'OTPVerification')
+    for otp in OTPVerification.objects.exclude(otp_code='').only('pk', 'otp_code').iterator():
+        otp_hash = hashlib.blake2s(str(otp.otp_code).encode(), key=key, digest_size=8).digest()
+        OTPVerification.objects.filter(pk=otp.pk).update(otp_hash=otp_hash)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_otpverification_is_active'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='otpverification',
+            name='accounts_ot_email_83ead2_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='otpverification',
+            name='accounts_ot_otp_cod_a8a0b0_idx',
+        ),
+        migrations.AddField(
+            model_name='otpverification',
+            name='otp_hash',
+            field=models.BinaryField(default=b'', editable=False, max_length=8),
+            preserve_default=False,
+        ),
+        migrations.RunPython(hash_existing_codes, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='otpverification',
+            name='otp_code',
+        ),
+    ]
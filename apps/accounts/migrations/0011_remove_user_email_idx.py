@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-15 06:46
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_otpverification_otp_hash'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='accounts_us_email_74c8d6_idx',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-15 06:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_remove_user_email_idx'),
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='beltprogress',
+            index=models.Index(fields=['user', '-achieved_on'], name='beltprog_user_achieved_idx'),
+        ),
+    ]
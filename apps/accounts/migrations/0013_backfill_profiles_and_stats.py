@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-15 06:52
+
+from django.db import migrations
+
+
+def backfill_profiles_and_stats(apps, schema_editor):
+    # Accounts created while the post_save signal was not connected have no child rows
+    User = apps.get_model('accounts', 'User')
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+    TrainingStats = apps.get_model('accounts', 'TrainingStats')
+    UserProfile.objects.bulk_create(
+        [UserProfile(user_id=pk) for pk in User.objects.filter(profile__isnull=True).values_list('pk', flat=True)],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    TrainingStats.objects.bulk_create(
+        [TrainingStats(user_id=pk) for pk in User.objects.filter(training_stats__isnull=True).values_list('pk', flat=True)],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_beltprogress_user_achieved_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_profiles_and_stats, migrations.RunPython.noop),
+    ]
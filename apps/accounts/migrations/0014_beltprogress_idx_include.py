@@ -0,0 +1,22 @@
+# Generated by Django 6.0 on 2026-10-15 06:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_backfill_profiles_and_stats'),
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='beltprogress',
+            name='beltprog_user_achieved_idx',
+        ),
+        migrations.AddIndex(
+            model_name='beltprogress',
+            index=models.Index(fields=['user', '-achieved_on'], include=('current_belt', 'test_score'), name='beltprog_user_achieved_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 6.0 on 2026-10-15 07:14
+
+from django.db import migrations
+
+
+TRIGRAM_INDEXES = (
+    ('accounts_otp_email_trgm_idx', 'accounts_otpverification'),
+    ('accounts_user_email_trgm_idx', 'accounts_user'),
+)
+
+
+def rebuild_on_upper(apps, schema_editor):
+    # __icontains compiles to UPPER(email::text) LIKE ...; index that expression
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+        schema_editor.execute(
+            f'CREATE INDEX {name} ON {table} USING gin ((UPPER(email::text)) gin_trgm_ops)'
+        )
+
+
+def rebuild_on_column(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+        schema_editor.execute(f'CREATE INDEX {name} ON {table} USING gin (email gin_trgm_ops)')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_beltprogress_idx_include'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_on_upper, rebuild_on_column),
+    ]
@@ -1,14 +1,41 @@
 # apps/accounts/models.py - COMPLETE FILE (FIXED FOR CIRCULAR DEPENDENCY)
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, Q, Subquery, Value, When
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.utils import timezone
 from django.conf import settings
 from django.core.validators import RegexValidator
-import random
-import string
+from django.db.models.functions import ExtractYear, Upper
+import hmac
+import secrets
 from datetime import timedelta
 
+from .utils import hash_otp_code
+
+
+# -----------------------------
+# Shared Choices
+# -----------------------------
+# Built once at import and shared by the models below
+BELTS = ('White', 'Yellow', 'Orange', 'Green', 'Blue', 'Brown', 'Black')
+BELT_LEVELS = tuple((belt, f'{belt} Belt') for belt in BELTS)
+BELT_COLORS = tuple((belt, belt) for belt in BELTS)
+
+GENDER_CHOICES = (
+    ('M', 'Male'),
+    ('F', 'Female'),
+    ('O', 'Other'),
+    ('N', 'Prefer not to say'),
+)
+
+OTP_PURPOSE_CHOICES = (
+    ('signup', 'Sign Up Verification'),
+    ('login', 'Login Verification'),
+    ('password_reset', 'Password Reset'),
+    ('email_change', 'Email Change'),
+)
+
 
 # -----------------------------
 # Custom User Manager
@@ -62,8 +89,9 @@ class User(AbstractUser):
     class Meta:
         ordering = ['-date_joined']
         indexes = [
-            models.Index(fields=['email']),
             models.Index(fields=['is_instructor', 'is_member']),
+            # Matches the UPPER(email) comparison Django emits for email__iexact
+            models.Index(Upper('email'), name='accounts_user_email_upper_idx'),
         ]
 
     def __str__(self):
@@ -81,23 +109,46 @@ class User(AbstractUser):
 # -----------------------------
 # Extended User Profile
 # -----------------------------
+class UserProfileQuerySet(models.QuerySet):
+    def with_completeness(self):
+        """
+        Annotate `profile_complete`, the SQL equivalent of
+        UserProfile.is_profile_complete, so it can be filtered and sorted.
+        """
+        return self.annotate(
+            profile_complete=Case(
+                When(
+                    Q(phone__gt='') & Q(date_of_birth__isnull=False) & Q(address__gt='')
+                    & Q(city__gt='') & Q(emergency_contact_name__gt='')
+                    & Q(emergency_contact_phone__gt=''),
+                    then=Value(True),
+                ),
+                default=Value(False),
+                output_field=models.BooleanField(),
+            )
+        )
+
+    def with_age(self):
+        """
+        Annotate `age_years`, the SQL equivalent of UserProfile.age.
+        Today's date is taken once for the whole queryset.
+        """
+        today = timezone.localdate()
+        birthday_pending = (
+            Q(date_of_birth__month__gt=today.month)
+            | Q(date_of_birth__month=today.month, date_of_birth__day__gt=today.day)
+        )
+        return self.annotate(
+            age_years=Value(today.year) - ExtractYear('date_of_birth') - Case(
+                When(birthday_pending, then=Value(1)),
+                default=Value(0),
+            )
+        )
+
+
 class UserProfile(models.Model):
-    GENDER_CHOICES = [
-        ('M', 'Male'),
-        ('F', 'Female'),
-        ('O', 'Other'),
-        ('N', 'Prefer not to say'),
-    ]
-
-    BELT_LEVELS = [
-        ('White', 'White Belt'),
-        ('Yellow', 'Yellow Belt'),
-        ('Orange', 'Orange Belt'),
-        ('Green', 'Green Belt'),
-        ('Blue', 'Blue Belt'),
-        ('Brown', 'Brown Belt'),
-        ('Black', 'Black Belt'),
-    ]
+    GENDER_CHOICES = GENDER_CHOICES
+    BELT_LEVELS = BELT_LEVELS
 
     phone_regex = RegexValidator(
         regex=r'^\+?1?\d{9,15}$',
@@ -129,6 +180,8 @@ class UserProfile(models.Model):
     joined_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = UserProfileQuerySet.as_manager()
+
     class Meta:
         ordering = ['-joined_at']
 
@@ -137,8 +190,11 @@ class UserProfile(models.Model):
 
     @property
     def age(self):
+        # Use the with_age() annotation when the row was loaded with it
+        if hasattr(self, 'age_years'):
+            return self.age_years
         if self.date_of_birth:
-            today = timezone.now().date()
+            today = timezone.localdate()
             return today.year - self.date_of_birth.year - (
                 (today.month, today.day) < (self.date_of_birth.month, self.date_of_birth.day)
             )
@@ -146,6 +202,9 @@ class UserProfile(models.Model):
 
     @property
     def is_profile_complete(self):
+        # Use the with_completeness() annotation when the row was loaded with it
+        if hasattr(self, 'profile_complete'):
+            return self.profile_complete
         required_fields = [
             self.phone, self.date_of_birth, self.address, 
             self.city, self.emergency_contact_name, self.emergency_contact_phone
@@ -157,15 +216,7 @@ class UserProfile(models.Model):
 # Belt Progress Tracker
 # -----------------------------
 class BeltProgress(models.Model):
-    BELT_COLORS = [
-        ('White', 'White'),
-        ('Yellow', 'Yellow'),
-        ('Orange', 'Orange'),
-        ('Green', 'Green'),
-        ('Blue', 'Blue'),
-        ('Brown', 'Brown'),
-        ('Black', 'Black'),
-    ]
+    BELT_COLORS = BELT_COLORS
 
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='belt_history')
     current_belt = models.CharField(max_length=20, choices=BELT_COLORS, default='White')
@@ -188,6 +239,15 @@ class BeltProgress(models.Model):
     class Meta:
         ordering = ['-achieved_on']
         verbose_name_plural = "Belt Progress Records"
+        indexes = [
+            # Per-member history, newest first; INCLUDE lets Postgres answer the
+            # dashboard's belt card from the index alone
+            models.Index(
+                fields=['user', '-achieved_on'],
+                name='beltprog_user_achieved_idx',
+                include=['current_belt', 'test_score'],
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.full_name} - {self.current_belt} Belt"
@@ -238,12 +298,9 @@ class OTPVerification(models.Model):
     """
     OTP verification model for email/phone verification
     """
-    OTP_PURPOSE_CHOICES = [
-        ('signup', 'Sign Up Verification'),
-        ('login', 'Login Verification'),
-        ('password_reset', 'Password Reset'),
-        ('email_change', 'Email Change'),
-    ]
+    OTP_PURPOSE_CHOICES = OTP_PURPOSE_CHOICES
+    # Returned when a concurrent attempt used up the last try or the code itself
+    ATTEMPT_REJECTED_MESSAGE = "This code can no longer be used. Please request a new code."
     
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, 
@@ -254,28 +311,36 @@ class OTPVerification(models.Model):
     )
     email = models.EmailField()
     phone = models.CharField(max_length=17, blank=True, null=True)
-    otp_code = models.CharField(max_length=6)
+    # Keyed blake2s digest of the code; the plaintext is never stored
+    otp_hash = models.BinaryField(max_length=8, editable=False)
     purpose = models.CharField(max_length=20, choices=OTP_PURPOSE_CHOICES, default='signup')
     is_verified = models.BooleanField(default=False)
+    # Cleared when a newer OTP is issued for the same email and purpose
+    is_active = models.BooleanField(default=True)
     attempts = models.PositiveIntegerField(default=0)
     max_attempts = models.PositiveIntegerField(default=5)
     created_at = models.DateTimeField(auto_now_add=True)
-    expires_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
     verified_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['email', 'otp_code', 'is_verified']),
             models.Index(fields=['created_at', 'expires_at']),
+            # Covers verify_otp's filter and newest-first ordering
+            models.Index(fields=['email', 'purpose', 'is_active', '-created_at'], name='otp_lookup_idx'),
         ]
     
+    # Plaintext code, only set on the instance that generated it (for sending)
+    otp_code = None
+    
     def __str__(self):
         return f"OTP for {self.email} - {self.purpose}"
     
     def save(self, *args, **kwargs):
-        if not self.otp_code:
-            self.otp_code = self.generate_otp()
+        if not self.otp_hash:
+            self.otp_code = self.otp_code or self.generate_otp()
+            self.otp_hash = hash_otp_code(self.otp_code)
         if not self.expires_at:
             self.expires_at = timezone.now() + timedelta(minutes=10)
         super().save(*args, **kwargs)
@@ -283,7 +348,7 @@ class OTPVerification(models.Model):
     @staticmethod
     def generate_otp(length=6):
         """Generate a random 6-digit OTP"""
-        return ''.join(random.choices(string.digits, k=length))
+        return f"{secrets.randbelow(10 ** length):0{length}d}"
     
     def is_expired(self):
         """Check if OTP has expired"""
@@ -293,35 +358,73 @@ class OTPVerification(models.Model):
         """Check if maximum verification attempts reached"""
         return self.attempts >= self.max_attempts
     
-    def verify(self, input_otp):
+    @staticmethod
+    def check_attempt(input_otp, otp_hash, attempts, max_attempts, expires_at, is_verified):
         """
-        Verify the OTP code
-        Returns: (success: bool, message: str)
+        Decide the outcome of one verification attempt.
+        `attempts` is the count before this attempt.
+        Returns: (success: bool, message: str, counted: bool)
+        Attempts rejected before the code is compared are not counted,
+        so callers skip the write for them.
         """
-        self.attempts += 1
-        self.save(update_fields=['attempts'])
-        
         # Check if max attempts reached
-        if self.is_max_attempts_reached():
-            return False, "Maximum verification attempts reached. Please request a new code."
+        if attempts >= max_attempts:
+            return False, "Maximum verification attempts reached. Please request a new code.", False
         
         # Check if expired
-        if self.is_expired():
-            return False, "OTP has expired. Please request a new code."
+        if timezone.now() > expires_at:
+            return False, "OTP has expired. Please request a new code.", False
         
         # Check if already verified
-        if self.is_verified:
-            return False, "This OTP has already been used."
+        if is_verified:
+            return False, "This OTP has already been used.", False
         
-        # Verify the code
-        if self.otp_code == input_otp:
-            self.is_verified = True
-            self.verified_at = timezone.now()
-            self.save(update_fields=['is_verified', 'verified_at'])
-            return True, "OTP verified successfully!"
+        # Verify the code (constant-time digest comparison)
+        if hmac.compare_digest(bytes(otp_hash), hash_otp_code(input_otp)):
+            return True, "OTP verified successfully!", True
         
-        remaining_attempts = self.max_attempts - self.attempts
-        return False, f"Invalid OTP. {remaining_attempts} attempts remaining."
+        remaining_attempts = max_attempts - attempts - 1
+        return False, f"Invalid OTP. {remaining_attempts} attempts remaining.", True
+    
+    @classmethod
+    def _record_attempt(cls, pk, success):
+        """
+        Persist one attempt (and success, if any) with a single conditional UPDATE
+        The limit and used checks sit in the WHERE clause, so concurrent guesses
+        can't get past max_attempts or verify a code twice.
+        Returns (recorded: bool, verified_at or None).
+        """
+        updates = {'attempts': F('attempts') + 1}
+        verified_at = None
+        if success:
+            verified_at = timezone.now()
+            updates.update(is_verified=True, verified_at=verified_at)
+        recorded = cls.objects.filter(
+            pk=pk, attempts__lt=F('max_attempts'), is_verified=False
+        ).update(**updates)
+        if not recorded:
+            return False, None
+        return True, verified_at
+    
+    def verify(self, input_otp):
+        """
+        Verify the OTP code
+        Returns: (success: bool, message: str)
+        """
+        success, message, counted = self.check_attempt(
+            input_otp, self.otp_hash, self.attempts,
+            self.max_attempts, self.expires_at, self.is_verified,
+        )
+        if not counted:
+            return success, message
+        recorded, verified_at = self._record_attempt(self.pk, success)
+        if not recorded:
+            return False, self.ATTEMPT_REJECTED_MESSAGE
+        self.attempts += 1
+        if success:
+            self.is_verified = True
+            self.verified_at = verified_at
+        return success, message
     
     @classmethod
     def create_otp(cls, email, purpose='signup', phone=None, user=None):
@@ -329,20 +432,23 @@ class OTPVerification(models.Model):
         Create a new OTP for the given email
         Invalidates any existing unverified OTPs
         """
-        # Invalidate existing unverified OTPs for this email and purpose
-        cls.objects.filter(
-            email=email,
-            purpose=purpose,
-            is_verified=False
-        ).update(is_verified=True)  # Mark as verified to prevent reuse
-        
-        # Create new OTP
-        otp = cls.objects.create(
-            user=user,
-            email=email,
-            phone=phone,
-            purpose=purpose
-        )
+        # Both writes commit together, so there is never more than one active OTP
+        with transaction.atomic():
+            # Invalidate existing unverified OTPs for this email and purpose
+            cls.objects.filter(
+                email=email,
+                purpose=purpose,
+                is_active=True,
+                is_verified=False
+            ).update(is_active=False)
+            
+            # Create new OTP
+            otp = cls.objects.create(
+                user=user,
+                email=email,
+                phone=phone,
+                purpose=purpose
+            )
         
         return otp
     
@@ -350,29 +456,43 @@ class OTPVerification(models.Model):
     def verify_otp(cls, email, otp_code, purpose='signup'):
         """
         Verify OTP for given email and purpose
-        Returns: (success: bool, message: str, otp_instance)
+        Reads the latest active OTP as a plain values() row; no model instance is built.
+        Returns: (success: bool, message: str, otp_data: dict or None)
         """
-        try:
-            otp = cls.objects.filter(
-                email=email,
-                purpose=purpose,
-                is_verified=False
-            ).order_by('-created_at').first()
-            
-            if not otp:
-                return False, "No valid OTP found. Please request a new code.", None
-            
-            success, message = otp.verify(otp_code)
-            return success, message, otp
-            
-        except cls.DoesNotExist:
-            return False, "Invalid OTP request.", None
+        otp = cls.objects.filter(
+            email=email,
+            purpose=purpose,
+            is_active=True,
+            is_verified=False
+        ).order_by('-created_at').values(
+            'id', 'otp_hash', 'attempts', 'max_attempts', 'expires_at', 'is_verified',
+        ).first()
+        
+        if not otp:
+            return False, "No valid OTP found. Please request a new code.", None
+        
+        success, message, counted = cls.check_attempt(
+            otp_code, otp['otp_hash'], otp['attempts'],
+            otp['max_attempts'], otp['expires_at'], otp['is_verified'],
+        )
+        if counted:
+            recorded, _ = cls._record_attempt(otp['id'], success)
+            if not recorded:
+                return False, cls.ATTEMPT_REJECTED_MESSAGE, otp
+            otp['attempts'] += 1
+        return success, message, otp
     
     @classmethod
-    def cleanup_expired(cls):
+    def cleanup_expired(cls, batch_size=10000):
         """
         Clean up expired OTPs (run this periodically via cron/celery)
+        Deletes in batches so each DELETE stays short on large tables.
         """
         expired_date = timezone.now() - timedelta(hours=24)
-        deleted_count = cls.objects.filter(created_at__lt=expired_date).delete()[0]
-        return deleted_count
\ No newline at end of file
+        expired = cls.objects.filter(created_at__lt=expired_date).order_by().values('pk')
+        deleted_count = 0
+        while True:
+            deleted, _ = cls.objects.filter(pk__in=Subquery(expired[:batch_size])).delete()
+            if not deleted:
+                return deleted_count
+            deleted_count += deleted
\ No newline at end of file
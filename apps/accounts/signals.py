@@ -1,10 +1,15 @@
 # apps/accounts/signals.py
-from django.db.models.signals import post_save
+import logging
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import UserProfile, TrainingStats
+from .models import BeltProgress, UserProfile, TrainingStats
+from .utils import PUBLIC_PROFILE_KEY
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
 @receiver(post_save, sender=User)
@@ -14,21 +19,21 @@ def create_user_profile(sender, instance, created, **kwargs):
     This signal is triggered after a User instance is saved.
     """
     if created:
-        # Create UserProfile for the new user
-        UserProfile.objects.get_or_create(user=instance)
-        
-        # Create TrainingStats for the new user
-        TrainingStats.objects.get_or_create(user=instance)
+        # One INSERT ... ON CONFLICT DO NOTHING each; rows that already exist are kept
+        UserProfile.objects.bulk_create([UserProfile(user=instance)], ignore_conflicts=True)
+        TrainingStats.objects.bulk_create([TrainingStats(user=instance)], ignore_conflicts=True)
         
-        print(f"✅ Profile and Stats created for user: {instance.email}")
+        logger.info("✅ Profile and Stats created for user: %s", instance.email)
 
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
+@receiver(post_save, sender=UserProfile)
+@receiver(post_save, sender=TrainingStats)
+@receiver(post_save, sender=BeltProgress)
+@receiver(post_delete, sender=BeltProgress)
+def invalidate_public_profile(sender, instance, **kwargs):
     """
-    Ensure the profile is saved when the user is saved.
-    This handles cases where the profile might exist but needs updating.
+    Drop the cached public profile data when anything it shows changes.
     """
-    # Only try to save if profile exists
-    if hasattr(instance, 'profile'):
-        instance.profile.save()
\ No newline at end of file
+    user_id = instance.pk if sender is User else instance.user_id
+    cache.delete(PUBLIC_PROFILE_KEY.format(user_id))
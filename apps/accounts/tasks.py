@@ -0,0 +1,55 @@
+# apps/accounts/tasks.py
+from celery import shared_task
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from .utils import LAST_ACTIVE_KEY, send_otp_email_sync
+
+
+@shared_task(bind=True, max_retries=3)
+def send_otp_email_task(self, email, otp_code, purpose='signup', user_name=None):
+    """Async task for OTP emails"""
+    if not send_otp_email_sync(email, otp_code, purpose, user_name):
+        # Back off 30s, 60s, 120s so a flaky SMTP relay isn't hammered
+        raise self.retry(countdown=30 * 2 ** self.request.retries)
+
+
+# Deletes each key only if it still holds the value that was flushed, so a
+# timestamp touch_last_active writes mid-flush is kept for the next run
+_DELETE_IF_UNCHANGED = """
+local deleted = 0
+for i, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[i] then
+        deleted = deleted + redis.call('DEL', key)
+    end
+end
+return deleted
+"""
+
+
+@shared_task
+def flush_last_active(batch_size=500):
+    """Write buffered last_active timestamps to the database in batches"""
+    if not hasattr(cache, 'iter_keys'):
+        return 0
+    from django_redis import get_redis_connection
+    
+    User = get_user_model()
+    redis = get_redis_connection('default')
+    delete_if_unchanged = redis.register_script(_DELETE_IF_UNCHANGED)
+    keys = list(cache.iter_keys(LAST_ACTIVE_KEY.format('*')))
+    flushed = 0
+    for start in range(0, len(keys), batch_size):
+        batch = keys[start:start + batch_size]
+        redis_keys = [cache.client.make_key(key) for key in batch]
+        users, read = [], []
+        for key, redis_key, raw in zip(batch, redis_keys, redis.mget(redis_keys)):
+            if raw is None:
+                continue
+            users.append(User(pk=int(key.rsplit(':', 1)[1]), last_active=cache.client.decode(raw)))
+            read.append((redis_key, raw))
+        User.objects.bulk_update(users, ['last_active'])
+        if read:
+            delete_if_unchanged(keys=[k for k, _ in read], args=[raw for _, raw in read])
+        flushed += len(users)
+    return flushed
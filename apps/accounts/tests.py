@@ -1,3 +1,82 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+
+from .models import OTPVerification
+from .utils import hash_otp_code
+
+
+def wrong_code(code):
+    return '000000' if code != '000000' else '111111'
+
+
+class OTPVerificationTests(TestCase):
+    """Hashed storage, attempt limits and single use of OTP codes"""
+
+    def setUp(self):
+        self.otp = OTPVerification.create_otp('member@example.com', purpose='login')
+        self.code = self.otp.otp_code
+
+    def fresh(self):
+        return OTPVerification.objects.get(pk=self.otp.pk)
+
+    def test_only_the_hash_is_stored(self):
+        stored = self.fresh()
+        self.assertIsNone(stored.otp_code)
+        self.assertEqual(bytes(stored.otp_hash), hash_otp_code(self.code))
+        self.assertNotIn(self.code.encode(), bytes(stored.otp_hash))
+
+    def test_correct_code_verifies_exactly_once(self):
+        self.assertTrue(self.fresh().verify(self.code)[0])
+        self.assertFalse(self.fresh().verify(self.code)[0])
+
+        stored = self.fresh()
+        self.assertTrue(stored.is_verified)
+        self.assertEqual(stored.attempts, 1)
+
+    def test_concurrent_correct_codes_verify_once(self):
+        first, second = self.fresh(), self.fresh()
+        self.assertTrue(first.verify(self.code)[0])
+        self.assertFalse(second.verify(self.code)[0])
+
+    def test_verify_otp_verifies_exactly_once(self):
+        self.assertTrue(OTPVerification.verify_otp('member@example.com', self.code, 'login')[0])
+        self.assertFalse(OTPVerification.verify_otp('member@example.com', self.code, 'login')[0])
+
+    def test_attempt_limit_is_enforced(self):
+        for _ in range(self.otp.max_attempts):
+            self.assertFalse(self.fresh().verify(wrong_code(self.code))[0])
+
+        success, message = self.fresh().verify(self.code)
+        self.assertFalse(success)
+        self.assertIn("Maximum verification attempts", message)
+        self.assertEqual(self.fresh().attempts, self.otp.max_attempts)
+
+    def test_last_attempt_cannot_be_used_twice(self):
+        OTPVerification.objects.filter(pk=self.otp.pk).update(attempts=self.otp.max_attempts - 1)
+        # Both requests read attempts before either writes
+        racers = [self.fresh() for _ in range(3)]
+
+        results = [racer.verify(wrong_code(self.code))[0] for racer in racers]
+        self.assertEqual(results, [False, False, False])
+        self.assertEqual(self.fresh().attempts, self.otp.max_attempts)
+
+        # The stale readers saw attempts left, but a correct code is still refused
+        self.assertFalse(racers[-1].verify(self.code)[0])
+        self.assertFalse(self.fresh().is_verified)
+
+    def test_expired_code_is_rejected(self):
+        OTPVerification.objects.filter(pk=self.otp.pk).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        success, message = self.fresh().verify(self.code)
+        self.assertFalse(success)
+        self.assertIn("expired", message)
+        self.assertFalse(self.fresh().is_verified)
 
-# Create your tests here.
+    def test_verified_code_is_rejected(self):
+        OTPVerification.objects.filter(pk=self.otp.pk).update(is_verified=True)
+        success, message = self.fresh().verify(self.code)
+        self.assertFalse(success)
+        self.assertIn("already been used", message)
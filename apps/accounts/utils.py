@@ -1,36 +1,100 @@
 # apps/accounts/utils.py - COMPLETE FILE
+import hashlib
+import logging
+import re
+
+from django.core.cache import cache
 from django.core.mail import send_mail
 from django.conf import settings
-from django.template.loader import render_to_string
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.utils import timezone
 from django.utils.html import strip_tags
 
 
+logger = logging.getLogger(__name__)
+
+EMAIL_PURPOSE_TEXT = {
+    'signup': 'Account Registration',
+    'login': 'Login Verification',
+    'password_reset': 'Password Reset',
+    'email_change': 'Email Change Verification',
+}
+
+SMS_PURPOSE_TEXT = {
+    'signup': 'Sign Up',
+    'login': 'Login',
+    'password_reset': 'Password Reset',
+}
+
+# Separators stripped from phone numbers before formatting
+_PHONE_STRIP_RE = re.compile(r'[\s\-()]+')
+
+# A complete OTP code: exactly six ASCII digits
+OTP_CODE_RE = re.compile(r'\A[0-9]{6}\Z')
+
+# Cache key for a user's buffered last_active timestamp
+LAST_ACTIVE_KEY = 'last_active:{}'
+
+# Cache key for a user's public profile data; cleared by accounts.signals
+PUBLIC_PROFILE_KEY = 'public_profile:{}'
+
+_otp_email_template = None
+
+
+def hash_otp_code(code):
+    """
+    Keyed blake2s digest (8 bytes) of an OTP code, as stored on OTPVerification
+    """
+    key = hashlib.blake2s(settings.OTP_KEY.encode()).digest()
+    return hashlib.blake2s(str(code).encode(), key=key, digest_size=8).digest()
+
+
+def _get_otp_email_template():
+    """
+    Load the OTP email template once per process
+    """
+    global _otp_email_template
+    if _otp_email_template is None:
+        _otp_email_template = get_template('accounts/email/otp_email.html')
+    return _otp_email_template
+
+
 def send_otp_email(email, otp_code, purpose='signup', user_name=None):
     """
-    Send OTP via email
+    Queue the OTP email on Celery so the request doesn't wait on SMTP.
+    Falls back to sending inline if the task can't be queued.
+    Returns True if the email was queued or sent.
     """
-    purpose_text = {
-        'signup': 'Account Registration',
-        'login': 'Login Verification',
-        'password_reset': 'Password Reset',
-        'email_change': 'Email Change Verification',
-    }
-    
-    subject = f'KKF - Your Verification Code for {purpose_text.get(purpose, "Verification")}'
+    try:
+        from .tasks import send_otp_email_task
+        send_otp_email_task.delay(email, otp_code, purpose, user_name)
+        return True
+    except Exception as e:
+        logger.warning("Could not queue OTP email, sending inline: %s", e)
+        return send_otp_email_sync(email, otp_code, purpose, user_name)
+
+
+def send_otp_email_sync(email, otp_code, purpose='signup', user_name=None):
+    """
+    Send OTP via email (synchronous version)
+    """
+    purpose_label = EMAIL_PURPOSE_TEXT.get(purpose, 'Verification')
+    subject = f'KKF - Your Verification Code for {purpose_label}'
     
     # Create email context
     context = {
         'otp_code': otp_code,
-        'purpose': purpose_text.get(purpose, 'Verification'),
-        'user_name': user_name or email.split('@')[0],
+        'purpose': purpose_label,
+        'user_name': user_name or email.partition('@')[0],
         'expires_in': '10 minutes',
     }
     
     # Try to render HTML email template
     try:
-        html_message = render_to_string('accounts/emails/otp_email.html', context)
+        html_message = _get_otp_email_template().render(context)
         plain_message = strip_tags(html_message)
-    except:
+    except TemplateDoesNotExist:
         # Fallback to simple message if template doesn't exist
         html_message = None
         plain_message = f"""
@@ -59,7 +123,7 @@ Kenya Karate Federation Team
         )
         return True
     except Exception as e:
-        print(f"Error sending OTP email: {e}")
+        logger.error("Error sending OTP email: %s", e, exc_info=True)
         return False
 
 
@@ -68,13 +132,7 @@ def send_otp_sms(phone, otp_code, purpose='signup'):
     Send OTP via SMS
     You'll need to integrate with an SMS provider like Twilio, Africa's Talking, etc.
     """
-    purpose_text = {
-        'signup': 'Sign Up',
-        'login': 'Login',
-        'password_reset': 'Password Reset',
-    }
-    
-    message = f"Your KKF {purpose_text.get(purpose, 'verification')} code is: {otp_code}. Valid for 10 minutes."
+    message = f"Your KKF {SMS_PURPOSE_TEXT.get(purpose, 'verification')} code is: {otp_code}. Valid for 10 minutes."
     
     # TODO: Integrate with your SMS provider
     # Example with Africa's Talking (Kenya):
@@ -89,15 +147,15 @@ def send_otp_sms(phone, otp_code, purpose='signup'):
         sms = africastalking.SMS
         
         response = sms.send(message, [phone])
-        print(response)
+        logger.info(response)
         return True
     except Exception as e:
-        print(f"Error sending SMS: {e}")
+        logger.error("Error sending SMS: %s", e)
         return False
     """
     
-    # For now, just print (development mode)
-    print(f"SMS to {phone}: {message}")
+    # For now, just log (development mode)
+    logger.info("SMS to %s: %s", phone, message)
     return True
 
 
@@ -110,7 +168,7 @@ def format_phone_number(phone):
         return None
     
     # Remove spaces, dashes, parentheses
-    phone = phone.replace(' ', '').replace('-', '').replace('(', '').replace(')', '')
+    phone = _PHONE_STRIP_RE.sub('', phone)
     
     # Handle Kenya numbers
     if phone.startswith('0'):
@@ -130,8 +188,18 @@ def validate_otp_code(code):
     if not code:
         return False
     
-    # Remove spaces
-    code = code.replace(' ', '')
-    
-    # Must be 6 digits
-    return code.isdigit() and len(code) == 6
\ No newline at end of file
+    # Remove spaces; must be 6 digits
+    return OTP_CODE_RE.match(code.replace(' ', '')) is not None
+
+
+def touch_last_active(user):
+    """
+    Record user activity in the cache; flush_last_active writes it to the DB.
+    Falls back to a direct UPDATE when the cache can't be scanned (non-Redis).
+    """
+    now = timezone.now()
+    user.last_active = now
+    if hasattr(cache, 'iter_keys'):
+        cache.set(LAST_ACTIVE_KEY.format(user.pk), now, timeout=None)
+    else:
+        type(user).objects.filter(pk=user.pk).update(last_active=now)
@@ -1,16 +1,21 @@
 # apps/accounts/views.py - COMPLETE FILE WITH OTP
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect
 from django.contrib import messages
-from django.contrib.auth import login, logout, update_session_auth_hash, authenticate
+from django.contrib.auth import login, logout, update_session_auth_hash
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.views import LoginView as DjangoLoginView
 from django.views.generic import CreateView, UpdateView
 from django.urls import reverse_lazy
 from django.utils import timezone
+from django.db import transaction
 from django.db.models import Count, Q, Sum
-from django.http import HttpResponse, JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse
 from django.views.decorators.http import require_http_methods
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+import secrets
 
 from .models import User, UserProfile, BeltProgress, TrainingStats, OTPVerification
 from .forms import (
@@ -18,13 +23,39 @@ from .forms import (
     UserAccountForm, BeltProgressForm, PasswordChangeForm,
     OTPVerificationForm, ResendOTPForm
 )
-from .utils import send_otp_email, send_otp_sms, validate_otp_code
+from .utils import (
+    PUBLIC_PROFILE_KEY, send_otp_email, send_otp_sms, touch_last_active, validate_otp_code,
+)
 
 
 # =============================================================================
 # OTP VERIFICATION VIEWS
 # =============================================================================
 
+def _stash_pending(request, kind, data):
+    """
+    Keep pending signup/login data in the cache until the OTP is verified.
+    The session only carries a random key, never the data itself.
+    """
+    key = secrets.token_urlsafe(16)
+    timeout = getattr(settings, 'OTP_EXPIRY_MINUTES', 10) * 60
+    cache.set(f'pending_{kind}:{key}', data, timeout=timeout)
+    request.session[f'pending_{kind}_key'] = key
+
+
+def _pop_pending(request, kind):
+    """
+    Remove and return pending data stored by _stash_pending, or None.
+    """
+    key = request.session.pop(f'pending_{kind}_key', None)
+    if not key:
+        return None
+    cache_key = f'pending_{kind}:{key}'
+    data = cache.get(cache_key)
+    cache.delete(cache_key)
+    return data
+
+
 def verify_otp_view(request):
     """
     Verify OTP code entered by user
@@ -50,8 +81,8 @@ def verify_otp_view(request):
                 
                 # Handle based on purpose
                 if purpose == 'signup':
-                    # Get user data from session
-                    user_data = request.session.get('pending_user_data')
+                    # Get user data stashed at signup
+                    user_data = _pop_pending(request, 'signup')
                     
                     if not user_data:
                         messages.error(request, "Session expired. Please sign up again.")
@@ -59,20 +90,18 @@ def verify_otp_view(request):
                     
                     # Create the user account
                     try:
-                        user = User.objects.create_user(
-                            email=user_data['email'],
-                            password=user_data['password'],
+                        # Password was hashed at signup; store the hash as-is
+                        user = User(
+                            email=User.objects.normalize_email(user_data['email']),
+                            password=user_data['password_hash'],
                             first_name=user_data['first_name'],
                             last_name=user_data['last_name'],
                             email_verified=True
                         )
-                        
-                        # Create profile and stats
-                        UserProfile.objects.get_or_create(user=user)
-                        TrainingStats.objects.get_or_create(user=user)
+                        user.save()
+                        # Profile and stats are created by the post_save signal
                         
                         # Clear session data
-                        del request.session['pending_user_data']
                         if 'otp_email' in request.session:
                             del request.session['otp_email']
                         if 'otp_purpose' in request.session:
@@ -93,27 +122,20 @@ def verify_otp_view(request):
                         return redirect('accounts:signup')
                 
                 elif purpose == 'login':
-                    # Get user credentials from session
-                    login_data = request.session.get('pending_login_data')
+                    # Get the user authenticated at the password step
+                    login_data = _pop_pending(request, 'login')
                     
                     if not login_data:
                         messages.error(request, "Session expired. Please log in again.")
                         return redirect('accounts:login')
                     
-                    # Authenticate and log in
-                    user = authenticate(
-                        request,
-                        username=login_data['email'],
-                        password=login_data['password']
-                    )
+                    user = User.objects.filter(pk=login_data['user_id'], is_active=True).first()
                     
                     if user:
-                        login(request, user)
-                        user.last_active = timezone.now()
-                        user.save(update_fields=['last_active'])
+                        login(request, user, backend=login_data['backend'])
+                        touch_last_active(user)
                         
                         # Clear session data
-                        del request.session['pending_login_data']
                         if 'otp_email' in request.session:
                             del request.session['otp_email']
                         if 'otp_purpose' in request.session:
@@ -199,13 +221,13 @@ class RegisterView(CreateView):
         """
         email = form.cleaned_data['email']
         
-        # Store user data in session (temporarily)
-        self.request.session['pending_user_data'] = {
+        # Hold user data (with the password already hashed) until OTP verification
+        _stash_pending(self.request, 'signup', {
             'email': email,
-            'password': form.cleaned_data['password1'],
+            'password_hash': make_password(form.cleaned_data['password1']),
             'first_name': form.cleaned_data['first_name'],
             'last_name': form.cleaned_data['last_name'],
-        }
+        })
         
         # Store OTP info in session
         self.request.session['otp_email'] = email
@@ -258,19 +280,17 @@ class LoginView(DjangoLoginView):
         """
         user = form.get_user()
         email = form.cleaned_data['username']
-        password = form.cleaned_data['password']
         
         # Check if user has OTP enabled (you can add this to UserProfile)
         # For now, we'll make OTP optional based on a setting
-        from django.conf import settings
         require_login_otp = getattr(settings, 'REQUIRE_LOGIN_OTP', False)
         
         if require_login_otp:
-            # Store login credentials in session
-            self.request.session['pending_login_data'] = {
-                'email': email,
-                'password': password,
-            }
+            # The password is already checked; only remember who passed it
+            _stash_pending(self.request, 'login', {
+                'user_id': user.pk,
+                'backend': user.backend,
+            })
             
             # Store OTP info
             self.request.session['otp_email'] = email
@@ -303,8 +323,7 @@ class LoginView(DjangoLoginView):
                 )
                 # Fallback: log in without OTP
                 login(self.request, user)
-                user.last_active = timezone.now()
-                user.save(update_fields=['last_active'])
+                touch_last_active(user)
                 return redirect('accounts:dashboard')
             
             return redirect('accounts:verify_otp')
@@ -312,8 +331,7 @@ class LoginView(DjangoLoginView):
         else:
             # Normal login without OTP
             login(self.request, user)
-            user.last_active = timezone.now()
-            user.save(update_fields=['last_active'])
+            touch_last_active(user)
             
             messages.success(self.request, f"Welcome back, {user.first_name}!")
             
@@ -347,28 +365,49 @@ def logout_view(request):
 # DASHBOARD & PROFILE VIEWS
 # =============================================================================
 
+def _users_with_profile():
+    """Users with profile and training stats joined in, for profile pages."""
+    return User.objects.select_related('profile', 'training_stats')
+
+
+def _get_training_stats(user):
+    """Return the user's TrainingStats, creating it for legacy accounts without one."""
+    try:
+        return user.training_stats
+    except TrainingStats.DoesNotExist:
+        return TrainingStats.objects.create(user=user)
+
+
 @login_required
 def dashboard_view(request):
     """
     User dashboard showing overview of activity.
     """
-    user = request.user
+    user = _users_with_profile().get(pk=request.user.pk)
     profile = user.profile
     
-    training_stats, _ = TrainingStats.objects.get_or_create(user=user)
-    belt_history = BeltProgress.objects.filter(user=user).order_by("-achieved_on")[:5]
+    training_stats = _get_training_stats(user)
+    # Plain rows for the summary card; served from beltprog_user_achieved_idx on Postgres
+    belt_history = BeltProgress.objects.filter(user=user).order_by("-achieved_on").values(
+        'current_belt', 'achieved_on', 'test_score'
+    )[:5]
     
     bookings = []
     try:
         from apps.classes.models import Booking
-        bookings = Booking.objects.filter(user=user).order_by('-booked_at')[:5]
+        # The template renders booking.schedule, whose __str__ reads karate_class
+        bookings = Booking.objects.filter(user=user).select_related(
+            'schedule__karate_class'
+        ).order_by('-booked_at')[:5]
     except (ImportError, Exception):
         pass
     
     orders = []
     try:
         from apps.store.models import Order
-        orders = Order.objects.filter(user=user).order_by('-created_at')[:5]
+        orders = Order.objects.filter(user=user).order_by('-created_at').values(
+            'id', 'status', 'created_at'
+        )[:5]
     except (ImportError, Exception):
         pass
     
@@ -391,12 +430,12 @@ def profile_view(request):
     """
     Display read-only view of user profile.
     """
-    user = request.user
+    user = _users_with_profile().get(pk=request.user.pk)
     profile = user.profile
     
-    training_stats, _ = TrainingStats.objects.get_or_create(user=user)
+    training_stats = _get_training_stats(user)
     profile_completion = _calculate_profile_completion(profile)
-    recent_belts = BeltProgress.objects.filter(user=user).order_by('-achieved_on')[:3]
+    recent_belts = BeltProgress.objects.filter(user=user).defer('notes').order_by('-achieved_on')[:3]
     
     context = {
         'profile': profile,
@@ -408,23 +447,80 @@ def profile_view(request):
     return render(request, 'accounts/profile_view.html', context)
 
 
+def _public_profile_data(user_id):
+    """
+    Load the DB-backed part of a public profile, cached per user.
+    Only plain display values are cached - never model instances, which
+    would carry the password hash and private contact details.
+    Returns None for unknown or inactive users.
+    """
+    key = PUBLIC_PROFILE_KEY.format(user_id)
+    data = cache.get(key)
+    if data is None:
+        profile_user = _users_with_profile().only(
+            'first_name', 'last_name', 'is_instructor', 'date_joined',
+            'profile__belt_level', 'profile__city', 'profile__country', 'profile__bio',
+            'profile__profile_picture', 'profile__years_of_experience', 'profile__joined_at',
+            'training_stats__total_classes_attended', 'training_stats__total_training_hours',
+            'training_stats__current_streak_days', 'training_stats__longest_streak_days',
+            'training_stats__last_training_date', 'training_stats__tournaments_participated',
+            'training_stats__tournaments_won',
+        ).filter(id=user_id, is_active=True).first()
+        if profile_user is None:
+            return None
+        profile = profile_user.profile
+        training_stats = _get_training_stats(profile_user)
+        data = {
+            'profile_user': {
+                'id': profile_user.id,
+                'first_name': profile_user.first_name,
+                'last_name': profile_user.last_name,
+                'full_name': profile_user.full_name,
+                'initials': profile_user.initials,
+                'is_instructor': profile_user.is_instructor,
+                'date_joined': profile_user.date_joined,
+            },
+            'profile': {
+                'belt_level': profile.belt_level,
+                'belt_level_display': profile.get_belt_level_display(),
+                'city': profile.city,
+                'country': profile.country,
+                'bio': profile.bio,
+                'profile_picture_url': profile.profile_picture.url if profile.profile_picture else None,
+                'years_of_experience': profile.years_of_experience,
+                'joined_at': profile.joined_at,
+            },
+            'training_stats': {
+                'total_classes_attended': training_stats.total_classes_attended,
+                'total_training_hours': training_stats.total_training_hours,
+                'current_streak_days': training_stats.current_streak_days,
+                'longest_streak_days': training_stats.longest_streak_days,
+                'last_training_date': training_stats.last_training_date,
+                'tournaments_participated': training_stats.tournaments_participated,
+                'tournaments_won': training_stats.tournaments_won,
+            },
+            'belt_history': list(
+                BeltProgress.objects.filter(user_id=user_id).order_by('-achieved_on').values(
+                    'current_belt', 'achieved_on', 'next_goal', 'test_score'
+                )[:5]
+            ),
+        }
+        cache.set(key, data, 60 * 15)
+    return data
+
+
 def public_profile_view(request, user_id):
     """
     Public profile view - visible to other users.
     """
-    profile_user = get_object_or_404(User, id=user_id, is_active=True)
-    profile = profile_user.profile
+    data = _public_profile_data(user_id)
+    if data is None:
+        raise Http404("No User matches the given query.")
     
-    training_stats, _ = TrainingStats.objects.get_or_create(user=profile_user)
-    belt_history = BeltProgress.objects.filter(user=profile_user).order_by('-achieved_on')[:5]
-    
-    is_own_profile = request.user.is_authenticated and request.user.id == profile_user.id
+    is_own_profile = request.user.is_authenticated and request.user.id == data['profile_user']['id']
     
     context = {
-        'profile_user': profile_user,
-        'profile': profile,
-        'training_stats': training_stats,
-        'belt_history': belt_history,
+        **data,
         'is_own_profile': is_own_profile,
     }
     
@@ -467,7 +563,7 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['profile_completion'] = _calculate_profile_completion(self.get_object())
+        context['profile_completion'] = _calculate_profile_completion(self.object)
         return context
 
 
@@ -554,7 +650,7 @@ def belt_progress_view(request):
     """
     belt_history = BeltProgress.objects.filter(
         user=request.user
-    ).order_by('-achieved_on')
+    ).select_related('instructor').order_by('-achieved_on')
     
     context = {
         'belt_history': belt_history,
@@ -569,7 +665,7 @@ def training_stats_view(request):
     """
     Display user's training statistics.
     """
-    stats, _ = TrainingStats.objects.get_or_create(user=request.user)
+    stats = _get_training_stats(request.user)
     
     context = {
         'stats': stats,
@@ -592,11 +688,14 @@ def add_belt_progress(request):
         if form.is_valid():
             belt_progress = form.save(commit=False)
             
-            user_profile = belt_progress.user.profile
-            user_profile.belt_level = belt_progress.current_belt
-            user_profile.save()
-            
-            belt_progress.save()
+            # Record the belt and update the member's current level together
+            with transaction.atomic():
+                belt_progress.save()
+                # update() skips auto_now, so updated_at is set explicitly
+                UserProfile.objects.filter(user_id=belt_progress.user_id).update(
+                    belt_level=belt_progress.current_belt,
+                    updated_at=timezone.now()
+                )
             
             messages.success(
                 request, 
@@ -613,69 +712,92 @@ def add_belt_progress(request):
 # EXPORT & DOWNLOAD FEATURES
 # =============================================================================
 
+def _render_profile_pdf(lines):
+    """Render the member profile PDF for the given text lines and return its bytes."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    from io import BytesIO
+    
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer, pagesize=letter)
+    
+    p.setFont("Helvetica-Bold", 16)
+    p.drawString(100, 750, f"Kenya Karate Federation - Member Profile")
+    
+    p.setFont("Helvetica", 12)
+    y = 700
+    for line in lines:
+        p.drawString(100, y, line)
+        y -= 20
+    
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
 @login_required
 def download_profile_pdf(request):
     """
     Generate PDF of user profile for download.
+    The rendered file is cached until any of the printed values change.
     """
+    import hashlib
+    
+    user = request.user
+    profile = user.profile
+    lines = (
+        f"Name: {user.full_name}",
+        f"Email: {user.email}",
+        f"Belt Level: {profile.belt_level}",
+        f"Member Since: {user.date_joined.strftime('%B %Y')}",
+    )
+    digest = hashlib.blake2s('\n'.join(lines).encode(), digest_size=8).hexdigest()
+    
     try:
-        from reportlab.lib.pagesizes import letter
-        from reportlab.pdfgen import canvas
-        from io import BytesIO
-        
-        buffer = BytesIO()
-        p = canvas.Canvas(buffer, pagesize=letter)
-        
-        user = request.user
-        profile = user.profile
-        
-        p.setFont("Helvetica-Bold", 16)
-        p.drawString(100, 750, f"Kenya Karate Federation - Member Profile")
-        
-        p.setFont("Helvetica", 12)
-        y = 700
-        p.drawString(100, y, f"Name: {user.full_name}")
-        y -= 20
-        p.drawString(100, y, f"Email: {user.email}")
-        y -= 20
-        p.drawString(100, y, f"Belt Level: {profile.belt_level}")
-        y -= 20
-        p.drawString(100, y, f"Member Since: {user.date_joined.strftime('%B %Y')}")
-        
-        p.showPage()
-        p.save()
-        
-        buffer.seek(0)
-        response = HttpResponse(buffer, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="profile_{user.id}.pdf"'
-        return response
+        pdf = cache.get_or_set(
+            f'profile_pdf:{user.id}:{digest}', lambda: _render_profile_pdf(lines), 60 * 60
+        )
     except ImportError:
         messages.error(request, "PDF generation not available. Install reportlab package.")
         return redirect('accounts:profile_view')
+    
+    response = HttpResponse(pdf, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="profile_{user.id}.pdf"'
+    return response
 
 
 @login_required
 def export_training_data(request):
     """
     Export training data as CSV.
+    Rows are streamed as they are read, so long histories aren't buffered.
     """
     import csv
-    from django.http import HttpResponse
+    from django.http import StreamingHttpResponse
     
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="training_data.csv"'
+    class Echo:
+        """File-like object whose write() hands the CSV line back to the caller"""
+        def write(self, value):
+            return value
     
-    writer = csv.writer(response)
-    writer.writerow(['Date', 'Belt Level', 'Test Score', 'Instructor', 'Notes'])
+    writer = csv.writer(Echo())
+    belt_history = BeltProgress.objects.filter(user=request.user).order_by(
+        '-achieved_on'
+    ).values_list('achieved_on', 'current_belt', 'test_score', 'instructor__name', 'notes')
     
-    belt_history = BeltProgress.objects.filter(user=request.user).order_by('-achieved_on')
-    for belt in belt_history:
-        writer.writerow([
-            belt.achieved_on,
-            belt.current_belt,
-            belt.test_score or 'N/A',
-            belt.instructor.name if belt.instructor else 'N/A',
-            belt.notes or ''
-        ])
+    def rows():
+        yield writer.writerow(['Date', 'Belt Level', 'Test Score', 'Instructor', 'Notes'])
+        for achieved_on, current_belt, test_score, instructor_name, notes in belt_history.iterator(chunk_size=1000):
+            yield writer.writerow([
+                achieved_on,
+                current_belt,
+                test_score or 'N/A',
+                instructor_name or 'N/A',
+                notes or ''
+            ])
     
-    return response
\ No newline at end of file
+    return StreamingHttpResponse(
+        rows(),
+        content_type='text/csv',
+        headers={'Content-Disposition': 'attachment; filename="training_data.csv"'},
+    )
@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.db.models import Count
 from django.utils.html import format_html
 from .models import BlogPost, Comment, Category, Tag, PostView, PostLike, Newsletter
 
@@ -9,9 +11,13 @@ class CategoryAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name',)}
     search_fields = ['name', 'description']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_post_count=Count('posts'))
+
     def post_count(self, obj):
-        return obj.posts.count()
+        return obj._post_count
     post_count.short_description = 'Posts'
+    post_count.admin_order_field = '_post_count'
 
 
 @admin.register(Tag)
@@ -20,9 +26,13 @@ class TagAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name',)}
     search_fields = ['name']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_post_count=Count('posts'))
+
     def post_count(self, obj):
-        return obj.posts.count()
+        return obj._post_count
     post_count.short_description = 'Posts'
+    post_count.admin_order_field = '_post_count'
 
 
 class CommentInline(admin.TabularInline):
@@ -33,15 +43,25 @@ class CommentInline(admin.TabularInline):
     can_delete = True
 
 
+class BlogPostChangeList(ChangeList):
+    """Changelist that skips the long text columns list_display never shows"""
+
+    def get_queryset(self, request, *args, **kwargs):
+        return super().get_queryset(request, *args, **kwargs).defer(
+            'content', 'meta_description', 'meta_keywords'
+        )
+
+
 @admin.register(BlogPost)
 class BlogPostAdmin(admin.ModelAdmin):
     list_display = ['title', 'author', 'category', 'status', 'featured', 'views_count', 'published_at', 'created_at']
     list_filter = ['status', 'featured', 'category', 'created_at', 'published_at']
+    list_select_related = ['author', 'category']
     search_fields = ['title', 'content', 'excerpt']
     prepopulated_fields = {'slug': ('title',)}
     filter_horizontal = ['tags']
     date_hierarchy = 'published_at'
-    readonly_fields = ['views_count', 'created_at', 'updated_at']
+    readonly_fields = ['views_count', 'comment_count', 'like_count', 'created_at', 'updated_at']
     inlines = [CommentInline]
     
     fieldsets = (
@@ -65,11 +85,14 @@ class BlogPostAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Metadata', {
-            'fields': ('views_count', 'published_at', 'created_at', 'updated_at'),
+            'fields': ('views_count', 'comment_count', 'like_count', 'published_at', 'created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
 
+    def get_changelist(self, request, **kwargs):
+        return BlogPostChangeList
+
     def save_model(self, request, obj, form, change):
         if not obj.author:
             obj.author = request.user
@@ -80,6 +103,7 @@ class BlogPostAdmin(admin.ModelAdmin):
 class CommentAdmin(admin.ModelAdmin):
     list_display = ['get_display_name', 'post', 'content_preview', 'approved', 'is_flagged', 'created_at']
     list_filter = ['approved', 'is_flagged', 'created_at']
+    list_select_related = ['post', 'author']
     search_fields = ['name', 'content', 'author__username', 'post__title']
     readonly_fields = ['created_at', 'updated_at']
     actions = ['approve_comments', 'unapprove_comments', 'flag_comments']
@@ -105,11 +129,16 @@ class CommentAdmin(admin.ModelAdmin):
     content_preview.short_description = 'Content'
 
     def approve_comments(self, request, queryset):
+        post_ids = set(queryset.values_list('post_id', flat=True))
         queryset.update(approved=True)
+        # update() skips the comment signals, so recount the affected posts here
+        BlogPost.recount_comments(post_ids)
     approve_comments.short_description = "Approve selected comments"
 
     def unapprove_comments(self, request, queryset):
+        post_ids = set(queryset.values_list('post_id', flat=True))
         queryset.update(approved=False)
+        BlogPost.recount_comments(post_ids)
     unapprove_comments.short_description = "Unapprove selected comments"
 
     def flag_comments(self, request, queryset):
@@ -121,6 +150,7 @@ class CommentAdmin(admin.ModelAdmin):
 class PostViewAdmin(admin.ModelAdmin):
     list_display = ['post', 'ip_address', 'user', 'viewed_at']
     list_filter = ['viewed_at']
+    list_select_related = ['post', 'user']
     search_fields = ['post__title', 'ip_address', 'user__username']
     readonly_fields = ['post', 'ip_address', 'user', 'viewed_at']
     date_hierarchy = 'viewed_at'
@@ -133,6 +163,7 @@ class PostViewAdmin(admin.ModelAdmin):
 class PostLikeAdmin(admin.ModelAdmin):
     list_display = ['user', 'post', 'created_at']
     list_filter = ['created_at']
+    list_select_related = ['user', 'post']
     search_fields = ['user__username', 'post__title']
     readonly_fields = ['post', 'user', 'created_at']
 
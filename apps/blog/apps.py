@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class BlogConfig(AppConfig):
     name = 'apps.blog'
+
+    def ready(self):
+        import apps.blog.signals  # noqa
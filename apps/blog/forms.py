@@ -1,8 +1,23 @@
+from types import MappingProxyType
+
 from django import forms
 from django.core.validators import EmailValidator
 from .models import Comment, Newsletter
 
 
+INPUT_CLASSES = (
+    'w-full px-4 py-3 rounded border-2 border-[#d6d3d1] text-[#525252] placeholder-[#525252] '
+    'focus:border-[#FFCD00] focus:outline-none transition-colors'
+)
+TEXTAREA_CLASSES = INPUT_CLASSES + ' resize-none'
+
+# Shared read-only widget attrs; each widget merges them into its own dict
+_INPUT_ATTRS = MappingProxyType({'class': INPUT_CLASSES})
+_TEXTAREA_ATTRS = MappingProxyType({'class': TEXTAREA_CLASSES})
+
+_validate_email = EmailValidator()
+
+
 class CommentForm(forms.ModelForm):
     """Form for posting comments with custom styling"""
     
@@ -11,17 +26,17 @@ class CommentForm(forms.ModelForm):
         fields = ['name', 'email', 'content']
         widgets = {
             'name': forms.TextInput(attrs={
-                'class': 'w-full px-4 py-3 rounded border-2 border-[#d6d3d1] text-[#525252] placeholder-[#525252] focus:border-[#FFCD00] focus:outline-none transition-colors',
+                **_INPUT_ATTRS,
                 'placeholder': 'Your name',
                 'required': False  # Will be required for non-authenticated users in view
             }),
             'email': forms.EmailInput(attrs={
-                'class': 'w-full px-4 py-3 rounded border-2 border-[#d6d3d1] text-[#525252] placeholder-[#525252] focus:border-[#FFCD00] focus:outline-none transition-colors',
+                **_INPUT_ATTRS,
                 'placeholder': 'Your email (optional, won\'t be published)',
                 'required': False
             }),
             'content': forms.Textarea(attrs={
-                'class': 'w-full px-4 py-3 rounded border-2 border-[#d6d3d1] text-[#525252] placeholder-[#525252] focus:border-[#FFCD00] focus:outline-none transition-colors resize-none',
+                **_TEXTAREA_ATTRS,
                 'rows': 4,
                 'placeholder': 'Share your thoughts...',
                 'required': True
@@ -48,8 +63,7 @@ class CommentForm(forms.ModelForm):
         """Validate email if provided"""
         email = self.cleaned_data.get('email')
         if email:
-            validator = EmailValidator()
-            validator(email)
+            _validate_email(email)
         return email
 
 
@@ -61,12 +75,12 @@ class NewsletterForm(forms.ModelForm):
         fields = ['email', 'name']
         widgets = {
             'email': forms.EmailInput(attrs={
-                'class': 'w-full px-4 py-3 rounded border-2 border-[#d6d3d1] text-[#525252] placeholder-[#525252] focus:border-[#FFCD00] focus:outline-none transition-colors',
+                **_INPUT_ATTRS,
                 'placeholder': 'Enter your email',
                 'required': True
             }),
             'name': forms.TextInput(attrs={
-                'class': 'w-full px-4 py-3 rounded border-2 border-[#d6d3d1] text-[#525252] placeholder-[#525252] focus:border-[#FFCD00] focus:outline-none transition-colors',
+                **_INPUT_ATTRS,
                 'placeholder': 'Your name (optional)',
                 'required': False
             })
@@ -83,6 +97,12 @@ class NewsletterForm(forms.ModelForm):
             email = email.lower().strip()
         return email
 
+    def validate_unique(self):
+        """
+        Skip the unique-email SELECT: the subscribe view's get_or_create
+        already handles existing (and lapsed) subscribers.
+        """
+
 
 class SearchForm(forms.Form):
     """Search form for blog posts"""
@@ -91,7 +111,7 @@ class SearchForm(forms.Form):
         required=False,
         label='Search',
         widget=forms.TextInput(attrs={
-            'class': 'w-full px-4 py-3 rounded border-2 border-[#d6d3d1] text-[#525252] placeholder-[#525252] focus:border-[#FFCD00] focus:outline-none transition-colors',
+            **_INPUT_ATTRS,
             'placeholder': 'Search articles...',
             'type': 'search'
         })
@@ -110,14 +130,14 @@ class ContactForm(forms.Form):
     name = forms.CharField(
         max_length=100,
         widget=forms.TextInput(attrs={
-            'class': 'w-full px-4 py-3 rounded border-2 border-[#d6d3d1] text-[#525252] placeholder-[#525252] focus:border-[#FFCD00] focus:outline-none transition-colors',
+            **_INPUT_ATTRS,
             'placeholder': 'Your name'
         })
     )
     
     email = forms.EmailField(
         widget=forms.EmailInput(attrs={
-            'class': 'w-full px-4 py-3 rounded border-2 border-[#d6d3d1] text-[#525252] placeholder-[#525252] focus:border-[#FFCD00] focus:outline-none transition-colors',
+            **_INPUT_ATTRS,
             'placeholder': 'Your email'
         })
     )
@@ -125,14 +145,14 @@ class ContactForm(forms.Form):
     subject = forms.CharField(
         max_length=200,
         widget=forms.TextInput(attrs={
-            'class': 'w-full px-4 py-3 rounded border-2 border-[#d6d3d1] text-[#525252] placeholder-[#525252] focus:border-[#FFCD00] focus:outline-none transition-colors',
+            **_INPUT_ATTRS,
             'placeholder': 'Subject'
         })
     )
     
     message = forms.CharField(
         widget=forms.Textarea(attrs={
-            'class': 'w-full px-4 py-3 rounded border-2 border-[#d6d3d1] text-[#525252] placeholder-[#525252] focus:border-[#FFCD00] focus:outline-none transition-colors resize-none',
+            **_TEXTAREA_ATTRS,
             'rows': 6,
             'placeholder': 'Your message'
         })
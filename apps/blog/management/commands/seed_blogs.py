@@ -3,59 +3,97 @@
 # Run with: python manage.py load_advanced_sample_data
 
 from django.core.management.base import BaseCommand
+from django.db import connection, transaction
 from django.utils import timezone
+from django.utils.text import slugify
 from django.contrib.auth import get_user_model
+from contextlib import contextmanager
 from datetime import datetime, timedelta, time
 from decimal import Decimal
+import io
+import os
 import random
 
 from apps.accounts.models import UserProfile, BeltProgress, TrainingStats
 from apps.core.models import Instructor, Achievement
 from apps.classes.models import KarateClass, ClassSchedule, Booking, PaymentLog
-from apps.blog.models import BlogPost, Comment
+from apps.blog.models import BlogPost, Category, Comment, Newsletter, Tag
 
 User = get_user_model()
 
+# Rows per INSERT for every bulk_create below. PostgreSQL gains little past
+# ~1000 rows per statement; MySQL/MariaDB keep improving up to ~10000.
+BULK_BATCH_SIZE = int(os.environ.get('SEED_BULK_BATCH_SIZE', 500))
+
 
 class Command(BaseCommand):
-    help = 'Load advanced sample data including edge cases and complex scenarios'
+    help = (
+        'Load advanced sample data including edge cases and complex scenarios. '
+        'Set SEED_BULK_BATCH_SIZE to tune rows per INSERT (default 500; '
+        '~1000 suits PostgreSQL, up to ~10000 for MySQL/MariaDB).'
+    )
+
+    defer_indexes = False
 
     def add_arguments(self, parser):
         parser.add_argument(
             '--scenario',
             type=str,
             default='all',
-            help='Scenario to load: all, payment_failures, cancellations, high_volume'
+            help='Scenario to load: all, payment_failures, cancellations, high_volume, blog_taxonomy'
+        )
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=20,
+            help='Number of bookings to generate for the high_volume scenario'
+        )
+        parser.add_argument(
+            '--copy',
+            action='store_true',
+            help='Load high_volume bookings with PostgreSQL COPY instead of INSERT (skips signals)'
+        )
+        parser.add_argument(
+            '--defer-indexes',
+            action='store_true',
+            help='Drop booking and comment indexes during bulk loads and rebuild them after (PostgreSQL)'
         )
 
     def handle(self, *args, **kwargs):
         scenario = kwargs['scenario']
+        self.defer_indexes = kwargs['defer_indexes']
         
         self.stdout.write(self.style.SUCCESS(f'Loading advanced scenario: {scenario}'))
         
-        if scenario == 'all' or scenario == 'payment_failures':
-            self.create_payment_failure_scenarios()
-        
-        if scenario == 'all' or scenario == 'cancellations':
-            self.create_cancellation_scenarios()
-        
-        if scenario == 'all' or scenario == 'high_volume':
-            self.create_high_volume_booking_scenarios()
-        
-        if scenario == 'all' or scenario == 'expired_payments':
-            self.create_expired_payment_scenarios()
-        
-        if scenario == 'all' or scenario == 'competitive_members':
-            self.create_competitive_member_profiles()
+        # Seed every scenario in one transaction: one COMMIT instead of one per INSERT
+        with transaction.atomic():
+            if scenario == 'all' or scenario == 'payment_failures':
+                self.create_payment_failure_scenarios()
+            
+            if scenario == 'all' or scenario == 'cancellations':
+                self.create_cancellation_scenarios()
+            
+            if scenario == 'all' or scenario == 'high_volume':
+                self.create_high_volume_booking_scenarios(kwargs['count'], use_copy=kwargs['copy'])
+            
+            if scenario == 'all' or scenario == 'expired_payments':
+                self.create_expired_payment_scenarios()
+            
+            if scenario == 'all' or scenario == 'competitive_members':
+                self.create_competitive_member_profiles()
+            
+            if scenario == 'all' or scenario == 'blog_taxonomy':
+                self.create_blog_taxonomy()
         
         self.stdout.write(self.style.SUCCESS('✅ Advanced sample data loaded!'))
 
+    @transaction.atomic
     def create_payment_failure_scenarios(self):
         """Create bookings with various payment failure scenarios"""
         self.stdout.write('Creating payment failure scenarios...')
         
-        users = User.objects.filter(is_member=True)[:3]
-        classes = KarateClass.objects.all()[:2]
+        users = User.objects.filter(is_member=True).select_related('profile')[:3]
+        classes = list(KarateClass.objects.prefetch_related('schedules')[:2])
         
         failure_scenarios = [
             {
@@ -87,13 +125,17 @@ class Command(BaseCommand):
             }
         ]
         
+        # One INSERT for the bookings, then one for their payment logs
+        bookings = []
+        scenarios = []
         for user in users:
             for karate_class in classes[:1]:
-                if karate_class.schedules.exists():
-                    schedule = karate_class.schedules.first()
+                schedules = karate_class.schedules.all()
+                if schedules:
+                    schedule = schedules[0]
                     scenario = random.choice(failure_scenarios)
                     
-                    booking = Booking.objects.create(
+                    booking = Booking(
                         user=user,
                         karate_class=karate_class,
                         schedule=schedule,
@@ -105,25 +147,34 @@ class Command(BaseCommand):
                         payment_attempts=random.randint(1, 3),
                         last_payment_attempt=timezone.now() - timedelta(minutes=random.randint(5, 30))
                     )
-                    
-                    # Create payment log
-                    PaymentLog.objects.create(
-                        booking=booking,
-                        action=scenario['action'],
-                        status_code=scenario['response']['ResultCode'],
-                        response_data=scenario['response'],
-                        ip_address='197.156.240.1',
-                        created_at=booking.last_payment_attempt
-                    )
+                    booking.fill_generated_fields()
+                    bookings.append(booking)
+                    scenarios.append(scenario)
+        
+        bookings = Booking.objects.bulk_create(bookings, batch_size=BULK_BATCH_SIZE)
+        
+        PaymentLog.objects.bulk_create([
+            PaymentLog(
+                booking=booking,
+                action=scenario['action'],
+                status_code=scenario['response']['ResultCode'],
+                response_data=scenario['response'],
+                ip_address='197.156.240.1',
+                created_at=booking.last_payment_attempt
+            )
+            for booking, scenario in zip(bookings, scenarios)
+        ], batch_size=BULK_BATCH_SIZE)
         
         self.stdout.write('  Created payment failure scenarios')
 
+    @transaction.atomic
     def create_cancellation_scenarios(self):
         """Create cancelled bookings with various reasons"""
         self.stdout.write('Creating cancellation scenarios...')
         
-        users = User.objects.filter(is_member=True)[:2]
-        classes = KarateClass.objects.all()[:2]
+        users = User.objects.filter(is_member=True).select_related('profile')[:2]
+        # Schedules load once with the classes, not per user
+        classes = list(KarateClass.objects.prefetch_related('schedules')[:2])
         
         cancellation_reasons = [
             'Schedule conflict - had to work',
@@ -136,8 +187,9 @@ class Command(BaseCommand):
         
         for user in users:
             for karate_class in classes[:1]:
-                if karate_class.schedules.exists():
-                    schedule = karate_class.schedules.first()
+                schedules = karate_class.schedules.all()
+                if schedules:
+                    schedule = schedules[0]
                     
                     booking = Booking.objects.create(
                         user=user,
@@ -157,17 +209,20 @@ class Command(BaseCommand):
         
         self.stdout.write('  Created cancellation scenarios')
 
+    @transaction.atomic
     def create_expired_payment_scenarios(self):
         """Create bookings that expired due to payment timeout"""
         self.stdout.write('Creating expired payment scenarios...')
         
-        users = User.objects.filter(is_member=True)[:2]
-        classes = KarateClass.objects.all()[:2]
+        users = User.objects.filter(is_member=True).select_related('profile')[:2]
+        # Schedules load once with the classes, not per user
+        classes = list(KarateClass.objects.prefetch_related('schedules')[:2])
         
         for user in users:
             for karate_class in classes[:1]:
-                if karate_class.schedules.exists():
-                    schedule = karate_class.schedules.first()
+                schedules = karate_class.schedules.all()
+                if schedules:
+                    schedule = schedules[0]
                     
                     booked_time = timezone.now() - timedelta(hours=random.randint(2, 24))
                     
@@ -187,46 +242,119 @@ class Command(BaseCommand):
         
         self.stdout.write('  Created expired payment scenarios')
 
-    def create_high_volume_booking_scenarios(self):
+    @transaction.atomic
+    def create_high_volume_booking_scenarios(self, count=20, use_copy=False):
         """Create multiple bookings to simulate high activity"""
         self.stdout.write('Creating high volume booking scenarios...')
         
-        users = list(User.objects.filter(is_member=True)[:5])
+        users = list(User.objects.filter(is_member=True).select_related('profile')[:5])
         classes = list(KarateClass.objects.all())
         
-        # Create 20 random bookings
-        for _ in range(20):
-            user = random.choice(users)
-            karate_class = random.choice(classes)
+        # Load every class's schedules once instead of querying per booking
+        schedules_by_class = {}
+        for schedule in ClassSchedule.objects.filter(karate_class__in=classes):
+            schedules_by_class.setdefault(schedule.karate_class_id, []).append(schedule)
+        
+        # Draw every random pick up front, one call per column, then build the
+        # bookings and insert them together
+        now = timezone.now()
+        picks = zip(
+            random.choices(users, k=count),
+            random.choices(classes, k=count),
+            random.choices(['Monthly', 'Monthly', 'Drop-in'], k=count),
+            random.choices(['Confirmed', 'Confirmed', 'Pending'], k=count),
+        )
+        bookings = []
+        for user, karate_class, booking_type, status in picks:
+            schedules = schedules_by_class.get(karate_class.pk)
             
-            if karate_class.schedules.exists():
-                schedule = random.choice(list(karate_class.schedules.all()))
-                
-                booking_type = random.choice(['Monthly', 'Monthly', 'Drop-in'])
-                status = random.choice(['Confirmed', 'Confirmed', 'Pending'])
+            if schedules:
+                schedule = random.choice(schedules)
+                confirmed = status == 'Confirmed'
                 
-                booking = Booking.objects.create(
+                booking = Booking(
                     user=user,
                     karate_class=karate_class,
                     schedule=schedule,
                     booking_type=booking_type,
                     status=status,
-                    payment_status='Paid' if status == 'Confirmed' else 'Pending',
-                    amount_paid=karate_class.price if status == 'Confirmed' else Decimal('0.00'),
+                    payment_status='Paid' if confirmed else 'Pending',
+                    amount_paid=karate_class.price if confirmed else Decimal('0.00'),
+                    transaction_id=f"TXN{random.randint(100000, 999999)}" if confirmed else None,
+                    mpesa_receipt_number=f"MPE{random.randint(1000000000, 9999999999)}" if confirmed else None,
                     phone_number=user.profile.phone if hasattr(user, 'profile') else None,
-                    booked_at=timezone.now() - timedelta(
+                    booked_at=now - timedelta(
                         days=random.randint(0, 60),
                         hours=random.randint(0, 23)
                     )
                 )
-                
-                if status == 'Confirmed':
-                    booking.transaction_id = f"TXN{random.randint(100000, 999999)}"
-                    booking.mpesa_receipt_number = f"MPE{random.randint(1000000000, 9999999999)}"
-                    booking.save()
+                booking.fill_generated_fields()
+                bookings.append(booking)
+        
+        with self.deferred_indexes(Booking):
+            if use_copy and connection.vendor == 'postgresql':
+                self.copy_rows(Booking, bookings)
+            else:
+                if use_copy:
+                    self.stdout.write(self.style.WARNING('  --copy needs PostgreSQL; using INSERT'))
+                # A clashing booking reference on a rerun drops that row instead of the whole batch
+                Booking.objects.bulk_create(bookings, batch_size=BULK_BATCH_SIZE, ignore_conflicts=True)
         
         self.stdout.write('  Created high volume booking scenarios')
 
+    @contextmanager
+    def deferred_indexes(self, model):
+        """
+        With --defer-indexes, drop the model's Meta indexes for a bulk load and
+        rebuild them once afterwards. Unique constraints are left in place.
+        """
+        if not self.defer_indexes:
+            yield
+            return
+        if connection.vendor != 'postgresql':
+            # Only PostgreSQL runs this DDL inside the seeding transaction
+            self.stdout.write(self.style.WARNING('  --defer-indexes needs PostgreSQL; keeping indexes'))
+            yield
+            return
+        
+        indexes = model._meta.indexes
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.remove_index(model, index)
+        # An error rolls the transaction back, which restores the dropped indexes
+        yield
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.add_index(model, index)
+
+    def copy_rows(self, model, objs):
+        """Load unsaved instances with PostgreSQL COPY (no signals, no conflict handling)"""
+        fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+        
+        def encode(value):
+            # COPY text format: \N for NULL, backslash-escape separators
+            if value is None:
+                return '\\N'
+            return (
+                str(value).replace('\\', '\\\\').replace('\t', '\\t')
+                .replace('\n', '\\n').replace('\r', '\\r')
+            )
+        
+        buffer = io.StringIO()
+        for obj in objs:
+            # pre_save fills auto_now_add fields the same way bulk_create does
+            buffer.write('\t'.join(
+                encode(field.get_db_prep_save(field.pre_save(obj, True), connection))
+                for field in fields
+            ) + '\n')
+        buffer.seek(0)
+        
+        quote = connection.ops.quote_name
+        columns = ', '.join(quote(field.column) for field in fields)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(f'COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN', buffer)
+
+    @transaction.atomic
     def create_competitive_member_profiles(self):
         """Create members with competitive training profiles"""
         self.stdout.write('Creating competitive member profiles...')
@@ -264,16 +392,28 @@ class Command(BaseCommand):
             }
         ]
         
+        # The post_save signal already inserts an empty profile and stats row per
+        # user, so both are written as one upsert each after the loop
+        profiles = []
+        stats = []
+        
+        # Skip members left by an earlier run so reseeding doesn't hit the unique email
+        existing_emails = set(User.objects.filter(
+            email__in=[user_data['email'] for user_data in competitive_users_data]
+        ).values_list('email', flat=True))
+        
         for user_data in competitive_users_data:
+            if user_data['email'] in existing_emails:
+                self.stdout.write(f'  Skipped existing member: {user_data["email"]}')
+                continue
+            
             profile_data = user_data.pop('profile')
-            user = User.objects.create_user(**user_data)
-            user.email_verified = True
-            user.save()
+            user = User.objects.create_user(email_verified=True, **user_data)
             
-            UserProfile.objects.create(user=user, **profile_data)
+            profiles.append(UserProfile(user=user, **profile_data))
             
             # Create impressive training stats
-            TrainingStats.objects.create(
+            stats.append(TrainingStats(
                 user=user,
                 total_classes_attended=random.randint(300, 500),
                 total_training_hours=Decimal(random.randint(500, 1000)),
@@ -282,17 +422,80 @@ class Command(BaseCommand):
                 last_training_date=timezone.now().date(),
                 tournaments_participated=random.randint(10, 25),
                 tournaments_won=random.randint(5, 15)
-            )
+            ))
             
             self.stdout.write(f'  Created competitive member: {user.email}')
         
+        UserProfile.objects.bulk_create(
+            profiles,
+            batch_size=BULK_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=[
+                'phone', 'belt_level', 'date_of_birth', 'gender', 'city',
+                'years_of_experience', 'training_goals',
+            ],
+        )
+        TrainingStats.objects.bulk_create(
+            stats,
+            batch_size=BULK_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=[
+                'total_classes_attended', 'total_training_hours', 'current_streak_days',
+                'longest_streak_days', 'last_training_date', 'tournaments_participated',
+                'tournaments_won',
+            ],
+        )
+        
         self.stdout.write('  Created competitive member profiles')
 
+    @transaction.atomic
+    def create_blog_taxonomy(self):
+        """Upsert blog categories, tags and newsletter subscribers"""
+        self.stdout.write('Creating blog categories, tags and subscribers...')
+        
+        categories = {
+            'Training Tips': 'Drills and advice for training at home and in the dojo',
+            'Competitions': 'Tournament news, results and preparation',
+            'Kata': 'Breakdowns of forms and their applications',
+            'Club News': 'Announcements from the federation and member clubs',
+        }
+        tags = ['beginners', 'kumite', 'kata', 'fitness', 'grading', 'nutrition']
+        subscribers = ['reader1@example.com', 'reader2@example.com', 'reader3@example.com']
+        
+        # One INSERT ... ON CONFLICT DO UPDATE per model, so reseeding never hits the unique keys
+        Category.objects.bulk_create(
+            [Category(name=name, slug=slugify(name), description=description)
+             for name, description in categories.items()],
+            batch_size=BULK_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['name'],
+            update_fields=['description'],
+        )
+        Tag.objects.bulk_create(
+            [Tag(name=name, slug=slugify(name)) for name in tags],
+            batch_size=BULK_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['name'],
+            update_fields=['slug'],
+        )
+        Newsletter.objects.bulk_create(
+            [Newsletter(email=email, is_active=True, unsubscribed_at=None) for email in subscribers],
+            batch_size=BULK_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['email'],
+            update_fields=['is_active', 'unsubscribed_at'],
+        )
+        
+        self.stdout.write('  Created blog categories, tags and subscribers')
+
+    @transaction.atomic
     def create_bulk_comments(self):
         """Create additional comments for engagement"""
         self.stdout.write('Creating bulk comments...')
         
-        posts = BlogPost.objects.filter(status='published')
+        posts = list(BlogPost.objects.filter(status='published').only('id'))
         users = list(User.objects.all()[:5])
         
         comment_templates = [
@@ -306,25 +509,34 @@ class Command(BaseCommand):
             "Exactly what I needed to read today.",
         ]
         
+        # Collect every comment, then insert them together
+        comments = []
         for post in posts:
             num_comments = random.randint(2, 5)
             for _ in range(num_comments):
                 if random.random() > 0.5 and users:
-                    # Authenticated comment
-                    Comment.objects.create(
+                    # Authenticated comment (bulk_create skips Comment.save(), which fills name)
+                    author = random.choice(users)
+                    comments.append(Comment(
                         post=post,
-                        author=random.choice(users),
+                        author=author,
+                        name=author.get_full_name(),
                         content=random.choice(comment_templates),
                         approved=True
-                    )
+                    ))
                 else:
                     # Guest comment
-                    Comment.objects.create(
+                    comments.append(Comment(
                         post=post,
                         name=f"Guest{random.randint(100, 999)}",
                         email=f"guest{random.randint(100, 999)}@example.com",
                         content=random.choice(comment_templates),
                         approved=random.choice([True, True, False])
-                    )
+                    ))
+        
+        with self.deferred_indexes(Comment):
+            Comment.objects.bulk_create(comments, batch_size=BULK_BATCH_SIZE)
+        # bulk_create sends no signals, so refresh the posts' comment counts directly
+        BlogPost.recount_comments([post.pk for post in posts])
         
         self.stdout.write('  Created bulk comments')
\ No newline at end of file
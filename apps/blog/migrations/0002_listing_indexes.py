@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-15 06:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['status', '-published_at'], name='blogpost_status_pub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postview',
+            index=models.Index(fields=['post', '-viewed_at'], name='postview_post_viewed_idx'),
+        ),
+    ]
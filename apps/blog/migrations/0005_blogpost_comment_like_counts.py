@@ -0,0 +1,42 @@
+# Generated by Django 6.0 on 2026-10-15 07:02
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counts(apps, schema_editor):
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    Comment = apps.get_model('blog', 'Comment')
+    PostLike = apps.get_model('blog', 'PostLike')
+    comments = Comment.objects.filter(
+        post=OuterRef('pk'), approved=True
+    ).order_by().values('post').annotate(total=Count('pk')).values('total')
+    likes = PostLike.objects.filter(
+        post=OuterRef('pk')
+    ).order_by().values('post').annotate(total=Count('pk')).values('total')
+    BlogPost.objects.update(
+        comment_count=Coalesce(Subquery(comments), 0),
+        like_count=Coalesce(Subquery(likes), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_blogpost_cat_status_pub_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Approved comments'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-15 07:03
+
+from django.db import migrations, models
+
+
+def backfill_reading_time(apps, schema_editor):
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    posts = list(BlogPost.objects.only('pk', 'content'))
+    for post in posts:
+        # Same formula as BlogPost.calculate_reading_time (200 words a minute)
+        post.reading_time_minutes = max(1, round(len(post.content.split()) / 200))
+    BlogPost.objects.bulk_update(posts, ['reading_time_minutes'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_blogpost_comment_like_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='reading_time_minutes',
+            field=models.PositiveSmallIntegerField(default=1, editable=False),
+        ),
+        migrations.RunPython(backfill_reading_time, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 6.0 on 2026-10-15 07:12
+
+from django.db import migrations
+
+
+TRIGRAM_INDEXES = (
+    ('blogpost_title_trgm_idx', 'title'),
+    ('blogpost_excerpt_trgm_idx', 'excerpt'),
+    ('blogpost_content_trgm_idx', 'content'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # Blog search uses __icontains, i.e. UPPER(col::text) LIKE UPPER('%q%').
+    # Only PostgreSQL can index that, and only on the same expression.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON blog_blogpost '
+            f'USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_blogpost_reading_time_minutes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 6.0 on 2026-10-15 07:10
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import TruncDate
+
+
+def backfill_viewed_date(apps, schema_editor):
+    PostView = apps.get_model('blog', 'PostView')
+    PostView.objects.update(viewed_date=TruncDate('viewed_at'))
+    # Keep the first view of each (post, ip, day) so the unique constraint can be added
+    earlier = PostView.objects.filter(
+        post=OuterRef('post'),
+        ip_address=OuterRef('ip_address'),
+        viewed_date=OuterRef('viewed_date'),
+        pk__lt=OuterRef('pk'),
+    )
+    PostView.objects.filter(Exists(earlier)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_blogpost_trigram_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='postview',
+            name='blog_postvi_post_id_e7b111_idx',
+        ),
+        migrations.AddField(
+            model_name='postview',
+            name='viewed_date',
+            field=models.DateField(default=django.utils.timezone.localdate, editable=False),
+        ),
+        migrations.RunPython(backfill_viewed_date, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='postview',
+            constraint=models.UniqueConstraint(fields=('post', 'ip_address', 'viewed_date'), name='postview_once_per_day'),
+        ),
+    ]
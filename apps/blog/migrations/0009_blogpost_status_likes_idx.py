@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-15 07:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_postview_once_per_day'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['status', '-like_count'], name='blogpost_status_likes_idx'),
+        ),
+    ]
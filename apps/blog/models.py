@@ -1,9 +1,11 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.utils.text import slugify
 from django.utils import timezone
 from django.urls import reverse
 from django.core.validators import MinLengthValidator
 from apps.accounts.models import User
+import re
 
 
 class Category(models.Model):
@@ -44,6 +46,18 @@ class Tag(models.Model):
         return self.name
 
 
+class BlogPostQuerySet(models.QuerySet):
+    def published(self):
+        """Published posts whose publish time has passed"""
+        return self.filter(status='published', published_at__lte=timezone.now())
+
+    def for_listing(self):
+        """Load what post cards render: author, category and tags, but not the body"""
+        return self.select_related('author', 'category').prefetch_related('tags').defer(
+            'content', 'meta_description', 'meta_keywords'
+        )
+
+
 class BlogPost(models.Model):
     """Enhanced blog post model with additional features"""
     STATUS_CHOICES = [
@@ -80,38 +94,70 @@ class BlogPost(models.Model):
     
     # Analytics
     views_count = models.PositiveIntegerField(default=0, editable=False)
+    comment_count = models.PositiveIntegerField(default=0, editable=False, help_text="Approved comments")
+    like_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time_minutes = models.PositiveSmallIntegerField(default=1, editable=False)
     
     # Timestamps
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     published_at = models.DateTimeField(null=True, blank=True)
 
+    objects = BlogPostQuerySet.as_manager()
+
     class Meta:
         ordering = ['-published_at', '-created_at']
         indexes = [
             models.Index(fields=['-published_at', 'status']),
+            # Published listings: filter on status, newest first
+            models.Index(fields=['status', '-published_at'], name='blogpost_status_pub_idx'),
             models.Index(fields=['slug']),
             models.Index(fields=['author', 'status']),
+            # Category listings and related posts: published posts in one category, newest first
+            models.Index(fields=['category', 'status', '-published_at'], name='blogpost_cat_status_pub_idx'),
+            # "Most liked" sort on the published listing
+            models.Index(fields=['status', '-like_count'], name='blogpost_status_likes_idx'),
         ]
 
     def save(self, *args, **kwargs):
+        # Partial saves (update_fields) only derive fields from values being written
+        update_fields = kwargs.get('update_fields')
+        saving_all = update_fields is None
+        saving = set() if saving_all else set(update_fields)
+        derived = []
+        
         # Auto-generate slug
-        if not self.slug:
+        if not self.slug and (saving_all or 'slug' in saving):
             base_slug = slugify(self.title)
+            # Fetch every colliding slug at once, then pick the first free suffix
+            taken = set(BlogPost.objects.filter(
+                slug__regex=rf'^{re.escape(base_slug)}(-[0-9]+)?$'
+            ).values_list('slug', flat=True))
             slug = base_slug
             counter = 1
-            while BlogPost.objects.filter(slug=slug).exists():
+            while slug in taken:
                 slug = f"{base_slug}-{counter}"
                 counter += 1
             self.slug = slug
         
         # Set published_at when first published
-        if self.status == 'published' and not self.published_at:
+        if (saving_all or 'status' in saving) and self.status == 'published' and not self.published_at:
             self.published_at = timezone.now()
+            derived.append('published_at')
         
-        # Auto-generate excerpt if empty
-        if not self.excerpt and self.content:
-            self.excerpt = self.content[:250] + '...' if len(self.content) > 250 else self.content
+        if saving_all or 'content' in saving:
+            # Store reading time so pages don't re-split the content on every render
+            self.reading_time_minutes = self.calculate_reading_time(self.content)
+            derived.append('reading_time_minutes')
+            
+            # Auto-generate excerpt if empty
+            if not self.excerpt and self.content:
+                content = self.content
+                self.excerpt = content if len(content) <= 250 else content[:250] + '...'
+                derived.append('excerpt')
+        
+        if not saving_all and derived:
+            kwargs['update_fields'] = saving.union(derived)
         
         super().save(*args, **kwargs)
 
@@ -120,30 +166,50 @@ class BlogPost(models.Model):
 
     def increment_views(self):
         """Increment view count"""
+        # Atomic UPDATE in the database; concurrent views can't overwrite each other
+        BlogPost.objects.filter(pk=self.pk).update(views_count=models.F('views_count') + 1)
         self.views_count += 1
-        self.save(update_fields=['views_count'])
 
-    def get_reading_time(self):
+    @classmethod
+    def recount_comments(cls, post_ids):
+        """Recalculate comment_count for the given posts in one UPDATE"""
+        approved = Comment.objects.filter(
+            post=models.OuterRef('pk'), approved=True
+        ).order_by().values('post').annotate(total=models.Count('pk')).values('total')
+        # updated_at moves too: it is the post page's Last-Modified
+        cls.objects.filter(pk__in=post_ids).update(
+            comment_count=Coalesce(models.Subquery(approved), 0),
+            updated_at=timezone.now()
+        )
+
+    @staticmethod
+    def calculate_reading_time(content):
         """Calculate estimated reading time in minutes"""
-        word_count = len(self.content.split())
+        word_count = len(content.split())
         minutes = word_count / 200  # Average reading speed
         return max(1, round(minutes))
 
+    def get_reading_time(self):
+        """Estimated reading time in minutes, computed at save"""
+        return self.reading_time_minutes
+
     def get_related_posts(self, limit=3):
-        """Get related posts based on tags and category"""
-        related = BlogPost.objects.filter(
-            status='published'
-        ).exclude(id=self.id)
+        """Get related posts, ranked by shared tags, then by recency"""
+        # Tag ids stay a subquery so the whole lookup is a single query
+        tag_ids = self.tags.values('id')
+        shares_tag = models.Q(tags__in=tag_ids)
         
-        # Prioritize same category and shared tags
-        if self.category:
-            related = related.filter(
-                models.Q(category=self.category) | models.Q(tags__in=self.tags.all())
-            )
-        else:
-            related = related.filter(tags__in=self.tags.all())
+        # Same category or at least one shared tag
+        condition = shares_tag
+        if self.category_id:
+            condition |= models.Q(category_id=self.category_id)
         
-        return related.distinct()[:limit]
+        # Grouping by the shared-tag count replaces distinct()
+        return BlogPost.objects.filter(
+            condition, status='published'
+        ).exclude(id=self.id).annotate(
+            shared_tags=models.Count('tags', filter=shares_tag)
+        ).order_by('-shared_tags', '-published_at')[:limit]
 
     @property
     def is_published(self):
@@ -201,10 +267,15 @@ class PostView(models.Model):
     ip_address = models.GenericIPAddressField()
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     viewed_at = models.DateTimeField(auto_now_add=True)
+    viewed_date = models.DateField(default=timezone.localdate, editable=False)
 
     class Meta:
+        constraints = [
+            # One counted view per IP per post per day
+            models.UniqueConstraint(fields=['post', 'ip_address', 'viewed_date'], name='postview_once_per_day'),
+        ]
         indexes = [
-            models.Index(fields=['post', 'ip_address']),
+            models.Index(fields=['post', '-viewed_at'], name='postview_post_viewed_idx'),
             models.Index(fields=['-viewed_at']),
         ]
 
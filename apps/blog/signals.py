@@ -0,0 +1,93 @@
+# apps/blog/signals.py
+from django.core.cache import cache
+from django.db.models import F, Q, Subquery
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import BlogPost, Category, Comment, PostLike, Tag
+from .utils import RELATED_POSTS_KEY, SIDEBAR_KEYS
+
+
+# Counter updates also bump updated_at, which is the post page's Last-Modified
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, **kwargs):
+    """
+    Keep BlogPost.comment_count in step with approved comments.
+    An edit may have flipped approval, so existing comments trigger a recount.
+    """
+    if not created:
+        BlogPost.recount_comments([instance.post_id])
+    elif instance.approved:
+        BlogPost.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1, updated_at=timezone.now()
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    if instance.approved:
+        BlogPost.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+            comment_count=F('comment_count') - 1, updated_at=timezone.now()
+        )
+
+
+@receiver(post_save, sender=PostLike)
+def count_saved_like(sender, instance, created, **kwargs):
+    if created:
+        BlogPost.objects.filter(pk=instance.post_id).update(
+            like_count=F('like_count') + 1, updated_at=timezone.now()
+        )
+
+
+@receiver(post_delete, sender=PostLike)
+def count_deleted_like(sender, instance, **kwargs):
+    BlogPost.objects.filter(pk=instance.post_id, like_count__gt=0).update(
+        like_count=F('like_count') - 1, updated_at=timezone.now()
+    )
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+def touch_neighbour_posts(sender, instance, **kwargs):
+    """
+    Bump updated_at on the published posts either side of this one, whose
+    next/previous links show its title, so their cached pages revalidate.
+    """
+    if not instance.published_at:
+        return
+    published = BlogPost.objects.filter(status='published').exclude(pk=instance.pk)
+    older = published.filter(published_at__lt=instance.published_at).order_by('-published_at')
+    newer = published.filter(published_at__gt=instance.published_at).order_by('published_at')
+    BlogPost.objects.filter(
+        Q(pk__in=Subquery(older.values('pk')[:1])) | Q(pk__in=Subquery(newer.values('pk')[:1]))
+    ).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+def invalidate_sidebars(sender, **kwargs):
+    """
+    Drop the cached blog list sidebars when posts, categories or tags change.
+    """
+    cache.delete_many(SIDEBAR_KEYS)
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+def invalidate_related_posts(sender, instance, **kwargs):
+    """
+    Drop the cached related-post ids of posts whose category or tags changed.
+    Other posts' lists refresh when their cache entry expires.
+    """
+    if isinstance(instance, BlogPost):
+        cache.delete(RELATED_POSTS_KEY.format(instance.pk))
+    elif kwargs.get('pk_set'):
+        # Tag-side change: pk_set holds the affected posts
+        cache.delete_many([RELATED_POSTS_KEY.format(pk) for pk in kwargs['pk_set']])
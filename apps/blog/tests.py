@@ -1,3 +1,65 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils.http import http_date
 
-# Create your tests here.
+from apps.accounts.models import User
+from .models import BlogPost, Newsletter, PostLike
+
+
+class BlogListCacheTests(TestCase):
+    """The cached blog list must still hand out a usable CSRF cookie"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_newsletter_signup_works_for_a_second_anonymous_visitor(self):
+        Client(enforce_csrf_checks=True).get(reverse('blog:post_list'))
+
+        client = Client(enforce_csrf_checks=True)
+        response = client.get(reverse('blog:post_list'))
+        self.assertIn('csrftoken', response.cookies)
+
+        response = client.post(reverse('blog:subscribe_newsletter'), {
+            'email': 'second@example.com',
+            'csrfmiddlewaretoken': client.cookies['csrftoken'].value,
+        })
+        self.assertNotEqual(response.status_code, 403)
+        self.assertTrue(Newsletter.objects.filter(email='second@example.com').exists())
+
+
+class BlogDetailConditionalGetTests(TestCase):
+    """Anonymous post pages answer conditional GETs from updated_at"""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(
+            email='author@example.com', password='x', first_name='Ann', last_name='Lee'
+        )
+        self.post = BlogPost.objects.create(
+            title='Kata basics', content='kata ' * 50, status='published', author=self.author
+        )
+
+    def get_conditional(self):
+        self.post.refresh_from_db(fields=['updated_at'])
+        return self.client.get(
+            self.post.get_absolute_url(), HTTP_IF_MODIFIED_SINCE=http_date(self.post.updated_at.timestamp())
+        )
+
+    def test_unchanged_post_returns_304(self):
+        self.assertEqual(self.get_conditional().status_code, 304)
+
+    def test_like_and_new_neighbour_bump_updated_at(self):
+        before = self.post.updated_at
+        PostLike.objects.create(post=self.post, user=self.author)
+        self.post.refresh_from_db(fields=['updated_at'])
+        self.assertGreater(self.post.updated_at, before)
+
+        before = self.post.updated_at
+        BlogPost.objects.create(title='Kumite', content='x', status='published', author=self.author)
+        self.post.refresh_from_db(fields=['updated_at'])
+        self.assertGreater(self.post.updated_at, before)
+
+    def test_signed_in_users_always_get_a_fresh_page(self):
+        self.client.force_login(self.author)
+        self.assertEqual(self.get_conditional().status_code, 200)
@@ -0,0 +1,15 @@
+# apps/blog/utils.py
+
+# Cache key marking a counted view: post id, visitor IP, date
+POST_VIEW_KEY = 'post_view:{}:{}:{}'
+
+# Cache keys for the blog list sidebars; cleared by blog.signals
+SIDEBAR_CATEGORIES_KEY = 'blog:sidebar:categories'
+SIDEBAR_TAGS_KEY = 'blog:sidebar:tags'
+SIDEBAR_FEATURED_KEY = 'blog:sidebar:featured'
+SIDEBAR_KEYS = [SIDEBAR_CATEGORIES_KEY, SIDEBAR_TAGS_KEY, SIDEBAR_FEATURED_KEY]
+SIDEBAR_TIMEOUT = 300
+
+# Cache key for a post's related-post ids; cleared by blog.signals
+RELATED_POSTS_KEY = 'blog:related:{}'
+RELATED_POSTS_TIMEOUT = 60 * 60
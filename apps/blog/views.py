@@ -1,13 +1,23 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import ListView, DetailView
 from django.contrib import messages
-from django.db.models import Q, Count, Prefetch
+from django.db.models import Q, Count, Exists, OuterRef, Prefetch, Subquery
 from django.http import JsonResponse
 from django.utils import timezone
-from django.views.decorators.http import require_POST
+from django.views.decorators.cache import cache_page
+from django.views.decorators.csrf import ensure_csrf_cookie
+from django.views.decorators.http import condition, require_POST
+from django.views.decorators.vary import vary_on_cookie
+from django.utils.decorators import method_decorator
 from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from .models import BlogPost, Comment, Category, Tag, PostView, PostLike, Newsletter
 from .forms import CommentForm, NewsletterForm
+from .utils import (
+    POST_VIEW_KEY, RELATED_POSTS_KEY, RELATED_POSTS_TIMEOUT,
+    SIDEBAR_CATEGORIES_KEY, SIDEBAR_FEATURED_KEY, SIDEBAR_TAGS_KEY, SIDEBAR_TIMEOUT,
+)
 
 
 def get_client_ip(request):
@@ -20,6 +30,29 @@ def get_client_ip(request):
     return ip
 
 
+def get_post_last_modified(request, slug):
+    """
+    Last-Modified for an anonymous visitor's post page: the post's updated_at.
+    blog.signals bumps it for new likes and comments and when a neighbouring
+    post (next/previous link) is published, edited or removed; views_count
+    alone can lag until the page changes for another reason.
+    """
+    # Signed-in pages carry the user's like state, and flash messages are one-off
+    if request.user.is_authenticated or messages.get_messages(request):
+        return None
+    
+    row = BlogPost.objects.published().filter(slug=slug).values_list('pk', 'updated_at').first()
+    if row is None:
+        return None
+    
+    # Kept so a 304 can still be counted as a view
+    request.blog_post_id = row[0]
+    return row[1]
+
+
+# ensure_csrf_cookie sits inside cache_page so the first, cookie-less response
+# sets the CSRF cookie and is therefore never cached for other visitors
+@method_decorator([cache_page(60), vary_on_cookie, ensure_csrf_cookie], name="dispatch")
 class BlogListView(ListView):
     """Enhanced blog list with filtering and search"""
     model = BlogPost
@@ -28,10 +61,7 @@ class BlogListView(ListView):
     paginate_by = 12
 
     def get_queryset(self):
-        queryset = BlogPost.objects.filter(
-            status='published',
-            published_at__lte=timezone.now()
-        ).select_related('author', 'category').prefetch_related('tags')
+        queryset = BlogPost.objects.published().for_listing()
         
         # Search functionality
         search_query = self.request.GET.get('q', '')
@@ -50,28 +80,38 @@ class BlogListView(ListView):
         # Tag filter
         tag_slug = self.request.GET.get('tag')
         if tag_slug:
-            queryset = queryset.filter(tags__slug=tag_slug)
+            # Exists() instead of a join so no DISTINCT is needed
+            queryset = queryset.filter(Exists(
+                BlogPost.tags.through.objects.filter(blogpost_id=OuterRef('pk'), tag__slug=tag_slug)
+            ))
         
         # Sort options
         sort = self.request.GET.get('sort', '-published_at')
-        if sort in ['-published_at', '-views_count', 'title']:
+        if sort in ['-published_at', '-views_count', '-like_count', 'title']:
             queryset = queryset.order_by(sort)
         
-        return queryset.distinct()
+        return queryset
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['categories'] = Category.objects.annotate(
-            post_count=Count('posts', filter=Q(posts__status='published'))
-        )
-        context['popular_tags'] = Tag.objects.annotate(
-            post_count=Count('posts', filter=Q(posts__status='published'))
-        ).order_by('-post_count')[:10]
-        context['featured_posts'] = BlogPost.objects.filter(
-            status='published',
-            featured=True,
-            published_at__lte=timezone.now()
-        ).select_related('author', 'category')[:3]
+        # Sidebars are the same on every page; cached and cleared by blog.signals
+        context['categories'] = cache.get_or_set(SIDEBAR_CATEGORIES_KEY, lambda: list(
+            Category.objects.annotate(
+                post_count=Count('posts', filter=Q(posts__status='published'))
+            )
+        ), SIDEBAR_TIMEOUT)
+        context['popular_tags'] = cache.get_or_set(SIDEBAR_TAGS_KEY, lambda: list(
+            Tag.objects.annotate(
+                post_count=Count('posts', filter=Q(posts__status='published'))
+            ).order_by('-post_count')[:10]
+        ), SIDEBAR_TIMEOUT)
+        context['featured_posts'] = cache.get_or_set(SIDEBAR_FEATURED_KEY, lambda: list(
+            BlogPost.objects.published().filter(
+                featured=True
+            ).select_related('author', 'category').defer(
+                'content', 'meta_description', 'meta_keywords'
+            )[:3]
+        ), SIDEBAR_TIMEOUT)
         context['search_query'] = self.request.GET.get('q', '')
         context['current_category'] = self.request.GET.get('category', '')
         context['current_tag'] = self.request.GET.get('tag', '')
@@ -85,10 +125,26 @@ class BlogDetailView(DetailView):
     context_object_name = "post"
 
     def get_queryset(self):
-        return BlogPost.objects.filter(
-            status='published',
-            published_at__lte=timezone.now()
-        ).select_related('author', 'category').prefetch_related(
+        queryset = BlogPost.objects.published()
+        
+        # Fold the visitor's like flag into the post query (counts are stored on the post)
+        if self.request.user.is_authenticated:
+            queryset = queryset.annotate(user_has_liked=Exists(
+                PostLike.objects.filter(post=OuterRef('pk'), user=self.request.user)
+            ))
+        
+        # Nearest older (next) and newer (previous) post for the page links
+        siblings = BlogPost.objects.filter(status='published')
+        older = siblings.filter(published_at__lt=OuterRef('published_at')).order_by('-published_at')
+        newer = siblings.filter(published_at__gt=OuterRef('published_at')).order_by('published_at')
+        queryset = queryset.annotate(
+            next_slug=Subquery(older.values('slug')[:1]),
+            next_title=Subquery(older.values('title')[:1]),
+            previous_slug=Subquery(newer.values('slug')[:1]),
+            previous_title=Subquery(newer.values('title')[:1]),
+        )
+        
+        return queryset.select_related('author', 'category').prefetch_related(
             'tags',
             Prefetch(
                 'comments',
@@ -98,34 +154,51 @@ class BlogDetailView(DetailView):
                 ).select_related('author').prefetch_related(
                     Prefetch(
                         'replies',
-                        queryset=Comment.objects.filter(approved=True).select_related('author')
+                        queryset=Comment.objects.filter(approved=True).select_related('author'),
+                        to_attr='approved_replies'
                     )
-                )
+                ),
+                to_attr='approved_comments'
             )
         )
 
+    def dispatch(self, request, *args, **kwargs):
+        response = self.conditional_dispatch(request, *args, **kwargs)
+        if response.status_code == 304:
+            # Not re-rendered, but still a view
+            self.track_view(BlogPost(pk=request.blog_post_id))
+        return response
+
+    @method_decorator(condition(last_modified_func=get_post_last_modified))
+    def conditional_dispatch(self, request, *args, **kwargs):
+        return super().dispatch(request, *args, **kwargs)
+
     def get_object(self, queryset=None):
         obj = super().get_object(queryset)
-        
-        # Track view (only once per IP per day)
+        self.track_view(obj)
+        return obj
+
+    def track_view(self, obj):
+        """Track view (only once per IP per day)"""
         ip_address = get_client_ip(self.request)
-        today = timezone.now().date()
-        
-        view_exists = PostView.objects.filter(
-            post=obj,
-            ip_address=ip_address,
-            viewed_at__date=today
-        ).exists()
-        
-        if not view_exists:
-            PostView.objects.create(
-                post=obj,
-                ip_address=ip_address,
-                user=self.request.user if self.request.user.is_authenticated else None
-            )
-            obj.increment_views()
+        today = timezone.localdate()
         
-        return obj
+        # cache.add() is atomic and only succeeds for the day's first view, so
+        # repeat views never touch the database
+        if cache.add(POST_VIEW_KEY.format(obj.pk, ip_address, today), True, 60 * 60 * 24):
+            try:
+                # The unique constraint still decides if the cache entry was lost
+                with transaction.atomic():
+                    PostView.objects.create(
+                        post=obj,
+                        ip_address=ip_address,
+                        user=self.request.user if self.request.user.is_authenticated else None,
+                        viewed_date=today
+                    )
+            except IntegrityError:
+                pass
+            else:
+                obj.increment_views()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -133,36 +206,36 @@ class BlogDetailView(DetailView):
         
         # Comments
         context['comment_form'] = CommentForm()
-        context['comment_count'] = post.comments.filter(approved=True).count()
+        context['comment_count'] = post.comment_count
         
-        # Related posts
-        context['related_posts'] = post.get_related_posts()
+        # Related posts: the ranking query is cached as ids, then the cards are
+        # loaded by primary key (dropping any post unpublished since)
+        related_ids = cache.get_or_set(
+            RELATED_POSTS_KEY.format(post.pk),
+            lambda: list(post.get_related_posts().values_list('id', flat=True)),
+            RELATED_POSTS_TIMEOUT
+        )
+        related = BlogPost.objects.published().only(
+            'slug', 'title', 'image', 'published_at'
+        ).in_bulk(related_ids)
+        context['related_posts'] = [related[pk] for pk in related_ids if pk in related]
         
         # Reading time
         context['reading_time'] = post.get_reading_time()
         
         # User interactions
-        if self.request.user.is_authenticated:
-            context['user_has_liked'] = PostLike.objects.filter(
-                post=post,
-                user=self.request.user
-            ).exists()
-        else:
-            context['user_has_liked'] = False
+        context['user_has_liked'] = getattr(post, 'user_has_liked', False)
         
         # Like count
-        context['likes_count'] = post.likes.count()
-        
-        # Next/Previous posts
-        context['next_post'] = BlogPost.objects.filter(
-            status='published',
-            published_at__lt=post.published_at
-        ).order_by('-published_at').first()
+        context['likes_count'] = post.like_count
         
-        context['previous_post'] = BlogPost.objects.filter(
-            status='published',
-            published_at__gt=post.published_at
-        ).order_by('published_at').first()
+        # Next/Previous posts (slug and title come annotated on the post)
+        context['next_post'] = (
+            BlogPost(slug=post.next_slug, title=post.next_title) if post.next_slug else None
+        )
+        context['previous_post'] = (
+            BlogPost(slug=post.previous_slug, title=post.previous_title) if post.previous_slug else None
+        )
         
         return context
 
@@ -221,9 +294,12 @@ def toggle_like(request, slug):
     else:
         liked = True
     
+    # like_count was just bumped by the PostLike signals
+    post.refresh_from_db(fields=['like_count'])
+    
     return JsonResponse({
         'liked': liked,
-        'likes_count': post.likes.count()
+        'likes_count': post.like_count
     })
 
 
@@ -279,11 +355,9 @@ class CategoryListView(ListView):
 
     def get_queryset(self):
         self.category = get_object_or_404(Category, slug=self.kwargs['slug'])
-        return BlogPost.objects.filter(
-            category=self.category,
-            status='published',
-            published_at__lte=timezone.now()
-        ).select_related('author', 'category').prefetch_related('tags')
+        return BlogPost.objects.published().filter(
+            category=self.category
+        ).for_listing()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -300,11 +374,9 @@ class TagListView(ListView):
 
     def get_queryset(self):
         self.tag = get_object_or_404(Tag, slug=self.kwargs['slug'])
-        return BlogPost.objects.filter(
-            tags=self.tag,
-            status='published',
-            published_at__lte=timezone.now()
-        ).select_related('author', 'category').prefetch_related('tags')
+        return BlogPost.objects.published().filter(
+            tags=self.tag
+        ).for_listing()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -322,15 +394,15 @@ class SearchView(ListView):
     def get_queryset(self):
         query = self.request.GET.get('q', '')
         if query:
-            return BlogPost.objects.filter(
+            return BlogPost.objects.published().filter(
                 Q(title__icontains=query) |
                 Q(content__icontains=query) |
                 Q(excerpt__icontains=query) |
-                Q(tags__name__icontains=query) |
-                Q(category__name__icontains=query),
-                status='published',
-                published_at__lte=timezone.now()
-            ).select_related('author', 'category').prefetch_related('tags').distinct()
+                Exists(BlogPost.tags.through.objects.filter(
+                    blogpost_id=OuterRef('pk'), tag__name__icontains=query
+                )) |
+                Q(category__name__icontains=query)
+            ).for_listing()
         return BlogPost.objects.none()
 
     def get_context_data(self, **kwargs):
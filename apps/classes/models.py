@@ -170,6 +170,7 @@ class Booking(models.Model):
         ordering = ['-booked_at']
         indexes = [
             models.Index(fields=['user', 'status']),
+            models.Index(fields=['user', '-booked_at'], name='booking_user_booked_idx'),
             models.Index(fields=['karate_class', 'status']),
             models.Index(fields=['transaction_id']),
             models.Index(fields=['booking_reference']),
@@ -177,11 +178,15 @@ class Booking(models.Model):
         ]
 
     def save(self, *args, **kwargs):
+        self.fill_generated_fields()
+        super().save(*args, **kwargs)
+
+    def fill_generated_fields(self):
+        """Set the reference and token save() generates (call before bulk_create)"""
         if not self.booking_reference:
             self.booking_reference = self.generate_booking_reference()
         if not self.payment_verification_token:
             self.payment_verification_token = secrets.token_urlsafe(32)
-        super().save(*args, **kwargs)
 
     def generate_booking_reference(self):
         """Generate unique booking reference"""
@@ -13,11 +13,14 @@ class GalleryCategoryAdmin(admin.ModelAdmin):
     search_fields = ['name', 'description']
     prepopulated_fields = {'slug': ('name',)}
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_image_count=Count('images'))
+    
     def image_count_display(self, obj):
         """Display image count"""
-        count = obj.images.count()
-        return f"{count} images"
+        return f"{obj._image_count} images"
     image_count_display.short_description = 'Images'
+    image_count_display.admin_order_field = '_image_count'
 
 
 @admin.register(GalleryImage)
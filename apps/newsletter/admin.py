@@ -182,9 +182,12 @@ class SubscriberAdmin(admin.ModelAdmin):
 
     def subscriber_stats(self, obj):
         if obj.pk:
-            total_emails = obj.email_logs.count()
-            successful = obj.email_logs.filter(success=True).count()
-            failed = obj.email_logs.filter(success=False).count()
+            stats = obj.email_logs.aggregate(
+                total=Count('id'),
+                successful=Count('id', filter=Q(success=True)),
+                failed=Count('id', filter=Q(success=False)),
+            )
+            total_emails, successful, failed = stats['total'], stats['successful'], stats['failed']
             
             percentage = round(successful / total_emails * 100, 1) if total_emails > 0 else 0
             
@@ -657,9 +660,12 @@ class CampaignAdmin(admin.ModelAdmin):
         logs = campaign.email_logs.select_related('subscriber').order_by('-sent_date')
         
         # Calculate statistics
-        total = logs.count()
-        successful = logs.filter(success=True).count()
-        failed = logs.filter(success=False).count()
+        stats = campaign.email_logs.aggregate(
+            total=Count('id'),
+            successful=Count('id', filter=Q(success=True)),
+            failed=Count('id', filter=Q(success=False)),
+        )
+        total, successful, failed = stats['total'], stats['successful'], stats['failed']
         success_rate = (successful / total * 100) if total > 0 else 0
         
         context = {
@@ -2,6 +2,9 @@
 # newsletter/signals.py - COMPLETE AUTOMATED EMAIL SIGNALS
 # ============================================================================
 
+from functools import partial
+
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.conf import settings
@@ -18,7 +21,7 @@ from apps.newsletter.models import Subscriber, Campaign
 # from gallery.models import GalleryImage  # Uncomment if you want gallery signals
 
 # Import Celery tasks
-from .tasks import create_automated_campaign, send_campaign
+from .tasks import create_automated_campaign, queue_comment_notification, send_campaign
 
 
 # ============================================================================
@@ -34,12 +37,15 @@ def store_old_status(sender, instance, **kwargs):
     """
     Capture the original status before save so we can detect actual changes.
     """
-    if instance.pk:  # Only for existing objects (not new ones)
-        try:
-            old_instance = sender.objects.get(pk=instance.pk)
-            instance._original_status = old_instance.status
-        except sender.DoesNotExist:
-            instance._original_status = None  # Shouldn't happen
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and 'status' not in update_fields:
+        # Partial save that leaves status alone; no lookup needed
+        instance._original_status = instance.status
+    elif instance.pk:  # Only for existing objects (not new ones)
+        # None if the row is missing, which shouldn't happen
+        instance._original_status = sender.objects.filter(
+            pk=instance.pk
+        ).values_list('status', flat=True).first()
     else:
         instance._original_status = None  # New instance
 
@@ -81,27 +87,9 @@ def handle_blog_post_published(sender, instance, created, **kwargs):
 
 @receiver(post_save, sender=Comment)
 def notify_comment_author(sender, instance, created, **kwargs):
-    """Notify blog post author when someone comments"""
-    if created and instance.approved and instance.post.author:
-        author_email = instance.post.author.email
-        
-        context = {
-            'post': instance.post,
-            'comment': instance,
-            'commenter': instance.get_display_name(),
-        }
-        
-        html_message = render_to_string('newsletter/emails/new_comment_notification.html', context)
-        plain_message = strip_tags(html_message)
-        
-        send_mail(
-            subject=f'💬 New comment on your post: {instance.post.title}',
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[author_email],
-            html_message=html_message,
-            fail_silently=True,  # Change to False when debugging
-        )
+    """Notify blog post author when someone comments (queued once the comment is committed)"""
+    if created and instance.approved:
+        transaction.on_commit(partial(queue_comment_notification, instance.pk))
 
 
 # ============================================================================
@@ -2,12 +2,18 @@
 # newsletter/tasks.py - COMPLETE VERSION
 # ============================================================================
 
-from django.core.mail import EmailMultiAlternatives
+import logging
+
+from celery import shared_task
+from django.core.mail import EmailMultiAlternatives, send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
 from django.utils import timezone
+from django.utils.html import strip_tags
 from .models import Campaign, Subscriber, EmailLog
 
+logger = logging.getLogger(__name__)
+
 
 def send_campaign(campaign_id):
     """Send email campaign to all targeted subscribers"""
@@ -108,3 +114,51 @@ def create_automated_campaign(campaign_type, title, subject, related_id, content
     # Auto-send
     send_campaign(campaign.id)
 
+
+def send_comment_notification(comment_id):
+    """Email a blog post's author about a new comment (synchronous version)"""
+    from apps.blog.models import Comment
+    
+    comment = Comment.objects.select_related('post__author', 'author').get(id=comment_id)
+    if not comment.post.author:
+        return
+    
+    context = {
+        'post': comment.post,
+        'comment': comment,
+        'commenter': comment.get_display_name(),
+    }
+    
+    html_message = render_to_string('newsletter/emails/new_comment_notification.html', context)
+    plain_message = strip_tags(html_message)
+    
+    send_mail(
+        subject=f'💬 New comment on your post: {comment.post.title}',
+        message=plain_message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[comment.post.author.email],
+        html_message=html_message,
+        fail_silently=True,  # Change to False when debugging
+    )
+
+
+@shared_task(bind=True, max_retries=3)
+def send_comment_notification_task(self, comment_id):
+    """Async task for new-comment emails"""
+    try:
+        send_comment_notification(comment_id)
+    except Exception as exc:
+        logger.error(f"Comment notification task failed: {exc}")
+        raise self.retry(exc=exc, countdown=60)
+
+
+def queue_comment_notification(comment_id):
+    """
+    Queue the new-comment email on Celery so the commenter doesn't wait on SMTP.
+    Falls back to sending inline if the task can't be queued.
+    """
+    try:
+        send_comment_notification_task.delay(comment_id)
+    except Exception as e:
+        logger.warning(f"Could not queue comment notification, sending inline: {e}")
+        send_comment_notification(comment_id)
@@ -15,9 +15,13 @@ class CategoryAdmin(admin.ModelAdmin):
     search_fields = ['name']
     prepopulated_fields = {'slug': ('name',)}
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_product_count=Count('products'))
+
     def product_count(self, obj):
-        return obj.products.count()
+        return obj._product_count
     product_count.short_description = 'Products'
+    product_count.admin_order_field = '_product_count'
 
 
 class ProductReviewInline(admin.TabularInline):